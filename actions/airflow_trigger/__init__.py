@@ -1,5 +1,5 @@
 """Airflow Trigger Action package."""
 
-from .action import AirflowTriggerAction
+from .action import AirflowTriggerAction, TriggerResult
 
-__all__ = ["AirflowTriggerAction"]
+__all__ = ["AirflowTriggerAction", "TriggerResult"]
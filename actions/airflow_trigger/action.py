@@ -5,25 +5,80 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import threading
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-import requests
-import yaml
-import uuid
-from prometheus_client import Counter, Histogram
+from .batching import BatchBuffer
+from .conf_template import ConfBuilder, compile_conf
+from .dag_cache import DagInfo, DagMetadataCache
+from .dlq import DeadLetterQueue, DlqEntry, error_class
+from .hedging import Hedger
+from .mappings import load_mappings
+from .predicates import Predicate, PredicateCompiler
+from .retry_budget import RetryBudget
+from .run_poller import RunStatePoller
+from .status_emitter import RunStatusEmitter
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
-trigger_counter = Counter(
-    "airflow_trigger_total", "Total Airflow trigger events", ["status"]
+_METRIC_NAMES = frozenset(
+    {"trigger_counter", "triggers_total", "trigger_failures_total", "latency_ms"}
 )
 
-triggers_total = Counter("triggers_total", "Total trigger attempts")
-trigger_failures_total = Counter(
-    "trigger_failures_total", "Total trigger failures"
-)
-latency_ms = Histogram("latency_ms", "Trigger latency in milliseconds")
+
+def __getattr__(name: str) -> Any:
+    """Expose metrics lazily so importing this module stays cheap."""
+    if name in _METRIC_NAMES:
+        from . import metrics
+
+        return getattr(metrics, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass(slots=True)
+class TriggerResult:
+    """Outcome of triggering one target DAG for an event.
+
+    ``dag_run_id`` is ``None`` while the event waits in a batch.
+    """
+
+    dag_id: str
+    dag_run_id: Optional[str]
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True, slots=True)
+class TriggerRequest:
+    """One dagRun POST, kept while it is in flight.
+
+    ``url`` is shared per DAG and constant ``conf`` subtrees are shared with
+    the mapping, so only the top-level ``payload`` and ``conf`` dicts are
+    allocated per request.
+    """
+
+    dag_id: str
+    dag_run_id: str
+    correlation_id: str
+    url: str
+    payload: Dict[str, Any]
+
+    @property
+    def log_extra(self) -> Dict[str, str]:
+        return {
+            "correlation_id": self.correlation_id,
+            "dag_id": self.dag_id,
+            "dag_run_id": self.dag_run_id,
+        }
 
 
 class AirflowTriggerAction:
@@ -42,6 +97,18 @@ class AirflowTriggerAction:
         backoff_factor: float = 0.5,
         request_timeout: int = 10,
         session: Optional[requests.Session] = None,
+        mappings_cache_path: Optional[str] = None,
+        fanout_workers: int = 8,
+        dag_cache_refresh_interval: Optional[float] = None,
+        dag_cache_miss_refresh_interval: float = 10.0,
+        unpause_paused_dags: bool = False,
+        strict_dag_validation: bool = False,
+        hedge_percentile: Optional[float] = None,
+        hedge_budget: float = 0.1,
+        hedge_concurrency: int = 32,
+        retry_budget: Optional[RetryBudget] = None,
+        status_emitter: Optional[RunStatusEmitter] = None,
+        run_state_poll_interval: Optional[float] = None,
     ) -> None:
         self.airflow_url = airflow_url.rstrip("/")
         self.username = username
@@ -51,31 +118,231 @@ class AirflowTriggerAction:
         self.dlq_path = dlq_path
         self.backoff_factor = backoff_factor
         self.request_timeout = request_timeout
-        self.session = session or requests.Session()
-        with open(mappings_path, "r", encoding="utf-8") as f:
-            self.mappings: Dict[str, Dict[str, Any]] = yaml.safe_load(f) or {}
+        self._session = session
+        self.fanout_workers = fanout_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.dlq = DeadLetterQueue(dlq_path) if dlq_path else None
+        self.mappings: Dict[str, Dict[str, Any]] = load_mappings(
+            mappings_path, mappings_cache_path
+        )
+        compiler = PredicateCompiler()
+        self.predicates: Dict[str, Predicate] = {
+            event_type: compiler.compile(mapping["when"])
+            for event_type, mapping in self.mappings.items()
+            if mapping.get("when")
+        }
+        self.target_predicates: Dict[Tuple[str, str], Predicate] = {
+            (event_type, target["dag_id"]): compiler.compile(target["when"])
+            for event_type, mapping in self.mappings.items()
+            for target in mapping["targets"]
+            if target.get("when")
+        }
+        self._conf_builders: Dict[Tuple[str, str], ConfBuilder] = {
+            (event_type, target["dag_id"]): compile_conf(target["conf"])
+            for event_type, mapping in self.mappings.items()
+            for target in mapping["targets"]
+        }
+        self._run_urls: Dict[str, str] = {
+            dag_id: f"{self.airflow_url}/api/v1/dags/{dag_id}/dagRuns"
+            for dag_id in {dag_id for _, dag_id in self._conf_builders}
+        }
+        self._headers, self._basic_auth = self._auth()
+        self._headers["Content-Type"] = "application/json"
+        self.retry_budget = retry_budget
+        self.status_emitter = status_emitter
+        self._batches = BatchBuffer(self._flush_batch)
+        self._stopping = threading.Event()
+        self.hedger: Optional[Hedger] = None
+        if hedge_percentile is not None:
+            # A primary and a hedge per concurrent POST.
+            self.hedger = Hedger(
+                percentile=hedge_percentile,
+                budget_ratio=hedge_budget,
+                max_workers=2 * hedge_concurrency,
+            )
+        self.unpause_paused_dags = unpause_paused_dags
+        self.dag_cache: Optional[DagMetadataCache] = None
+        if dag_cache_refresh_interval:
+            headers, auth = self._auth()
+            self.dag_cache = DagMetadataCache(
+                self.airflow_url,
+                self.session,
+                headers=headers,
+                auth=auth,
+                refresh_interval=dag_cache_refresh_interval,
+                request_timeout=request_timeout,
+                miss_refresh_interval=dag_cache_miss_refresh_interval,
+            )
+            self._validate_dags(strict_dag_validation)
+            self.dag_cache.start()
+        self.run_poller: Optional[RunStatePoller] = None
+        if status_emitter is not None and run_state_poll_interval:
+            headers, auth = self._auth()
+            self.run_poller = RunStatePoller(
+                self.airflow_url,
+                self.session,
+                status_emitter,
+                headers=headers,
+                auth=auth,
+                interval=run_state_poll_interval,
+                request_timeout=request_timeout,
+            )
+            self.run_poller.start()
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session, created on first use to defer importing ``requests``."""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def begin_shutdown(self) -> None:
+        """Abandon pending retries so in-flight triggers finish quickly.
+
+        A trigger that fails from now on, or finishes its current backoff,
+        goes to the DLQ instead of retrying.
+        """
+        self._stopping.set()
+
+    def close(self) -> None:
+        """Stop background refresh and polling and release worker threads."""
+        if self.dag_cache is not None:
+            self.dag_cache.stop()
+        if self.run_poller is not None:
+            self.run_poller.stop()
+        self._batches.close()
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self.hedger is not None:
+            self.hedger.shutdown()
+
+    def _auth(self) -> Tuple[Dict[str, str], Optional[Tuple[str, str]]]:
+        """Return auth headers and basic-auth credentials for Airflow calls."""
+        headers: Dict[str, str] = {}
+        auth = None
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        elif self.username and self.password:
+            auth = (self.username, self.password)
+        return headers, auth
+
+    def _validate_dags(self, strict: bool) -> None:
+        """Check mapped DAGs against the metadata cache at load time."""
+        assert self.dag_cache is not None
+        if not self.dag_cache.refresh():
+            return
+        dag_ids = {
+            target["dag_id"]
+            for mapping in self.mappings.values()
+            for target in mapping["targets"]
+        }
+        problems = self.dag_cache.validate(sorted(dag_ids))
+        for dag_id, reason in problems.items():
+            logger.warning("mapped DAG %s is %s", dag_id, reason)
+        if strict and problems:
+            details = ", ".join(f"{d} ({r})" for d, r in problems.items())
+            raise ValueError(f"mappings reference unusable DAGs: {details}")
+
+    def _dag_rejection(self, dag_id: str) -> Optional[str]:
+        """Return why the DAG cache says ``dag_id`` cannot be triggered."""
+        if self.dag_cache is None:
+            return None
+        return self.dag_cache.rejection(dag_id)
+
+    def _unpause(self, dag_id: str) -> None:
+        headers, auth = self._auth()
+        resp = self.session.patch(
+            f"{self.airflow_url}/api/v1/dags/{dag_id}",
+            params={"update_mask": "is_paused"},
+            json={"is_paused": False},
+            headers=headers,
+            auth=auth,
+            timeout=self.request_timeout,
+        )
+        resp.raise_for_status()
+        if self.dag_cache is not None:
+            self.dag_cache.update(DagInfo(dag_id, is_paused=False, is_active=True))
+
+    def _retry_allowed(self, attempt: int, extra: Dict[str, str]) -> bool:
+        """Return whether another attempt may follow ``attempt``."""
+        if attempt >= self.max_retries:
+            return False
+        if self.retry_budget is not None and not self.retry_budget.try_retry():
+            logger.warning("retry budget exhausted, not retrying", extra=extra)
+            return False
+        return True
+
+    def _backoff(self, attempt: int, extra: Dict[str, str]) -> None:
+        """Wait before retrying; raise if shutdown began before or meanwhile."""
+        if not self._stopping.is_set():
+            time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+        if self._stopping.is_set():
+            logger.warning("shutting down, not retrying", extra=extra)
+            raise RuntimeError("retry abandoned: shutting down")
+
+    def _post(
+        self,
+        dag_id: str,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        auth: Optional[Tuple[str, str]],
+    ) -> Tuple[Any, bool]:
+        """POST a dagRun, hedged per ``dag_id`` when hedging is enabled."""
+
+        def post() -> Any:
+            return self.session.post(
+                url,
+                json=payload,
+                headers=headers,
+                auth=auth,
+                timeout=self.request_timeout,
+            )
+
+        if self.hedger is None:
+            return post(), False
+        return self.hedger.call(dag_id, post)
 
     @staticmethod
-    def _dag_run_id(dag_id: str, event: Dict[str, Any]) -> str:
+    def dag_run_id(dag_id: str, event: Dict[str, Any]) -> str:
         """Build a deterministic dag_run_id from the event."""
         payload = json.dumps(event, sort_keys=True)
         digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:8]
         return f"{dag_id}-{digest}"
 
-    def _resolve_conf(self, conf_template: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
-        """Recursively resolve templated conf values from the event."""
+    def _resolve_conf(self, target: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve the target's conf for ``event`` from its compiled template.
 
-        def resolve(value: Any) -> Any:
-            if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-                event_key = value.strip("{} ")
-                return event.get(event_key)
-            if isinstance(value, dict):
-                return {k: resolve(v) for k, v in value.items()}
-            if isinstance(value, list):
-                return [resolve(v) for v in value]
-            return value
+        Only the top-level dict is new; nested values may be shared with the
+        mapping and other runs and must not be mutated.
+        """
+        return self._conf_builders[(event.get("type"), target["dag_id"])](event)
 
-        return {k: resolve(v) for k, v in conf_template.items()}
+    def _build_request(
+        self, events: List[Dict[str, Any]], target: Dict[str, Any], correlation_id: str
+    ) -> TriggerRequest:
+        """Build the dagRun POST for ``events`` (several for a batched run)."""
+        dag_id = target["dag_id"]
+        dag_run_id = self.dag_run_id(
+            dag_id, events[0] if len(events) == 1 else {"events": events}
+        )
+        if target.get("batch"):
+            conf = self._batch_conf(target, events)
+        else:
+            conf = self._resolve_conf(target, events[0])
+        conf["correlation_id"] = correlation_id
+        return TriggerRequest(
+            dag_id,
+            dag_run_id,
+            correlation_id,
+            self._run_urls[dag_id],
+            {"dag_run_id": dag_run_id, "conf": conf},
+        )
 
     def _check_health(self) -> tuple[bool, str]:
         """Return Airflow health status and error message."""
@@ -97,70 +364,318 @@ class AirflowTriggerAction:
             return False, str(e)
 
     def _write_dlq(
-        self, event: Dict[str, Any], dag_id: str, dag_run_id: str, error: str
+        self, event: Dict[str, Any], dag_id: str, dag_run_id: str, error: Exception
     ) -> None:
-        if not self.dlq_path:
+        if self.dlq is None:
             return
-        entry = {
-            "timestamp": time.time(),
-            "event": event,
-            "dag_id": dag_id,
-            "dag_run_id": dag_run_id,
-            "error": error,
-        }
-        with open(self.dlq_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        self.dlq.append(
+            DlqEntry(
+                time.time(), event, dag_id, dag_run_id, str(error), error_class(error)
+            )
+        )
+
+    def _record_status(
+        self, event: Dict[str, Any], dag_id: str, dag_run_id: str, state: str
+    ) -> None:
+        """Buffer the run status for write-back to the triggering entity.
+
+        Queued runs are also handed to the poller, which records their final
+        state.
+        """
+        urn = event.get("entityUrn")
+        if self.status_emitter is not None and urn:
+            self.status_emitter.record(urn, dag_id, dag_run_id, state)
+            if state == "queued" and self.run_poller is not None:
+                self.run_poller.track(urn, dag_id, dag_run_id)
+
+    def _fanout(self, calls: List[Any]) -> List[TriggerResult]:
+        """Run per-target trigger calls, in parallel when there are several."""
+        if len(calls) == 1:
+            return [calls[0]()]
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.fanout_workers, thread_name_prefix="airflow-trigger"
+                )
+            executor = self._executor
+        return list(executor.map(lambda call: call(), calls))
+
+    def trigger(
+        self,
+        event: Dict[str, Any],
+        *,
+        dag_ids: Optional[Iterable[str]] = None,
+        batch: bool = True,
+        replay: bool = False,
+    ) -> Optional[str]:
+        """Trigger the DAG runs mapped to the given event.
+
+        Returns the ``dag_run_id`` of the first target, or ``None`` if
+        predicates rejected every target or the first target is batched. If
+        any target failed, the first failure is re-raised after all targets
+        have been attempted. Use :meth:`trigger_targets` for per-target
+        results.
+        """
+        results = self.trigger_targets(
+            event, dag_ids=dag_ids, batch=batch, replay=replay
+        )
+        if not results:
+            return None
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        return results[0].dag_run_id
+
+    def trigger_targets(
+        self,
+        event: Dict[str, Any],
+        *,
+        dag_ids: Optional[Iterable[str]] = None,
+        batch: bool = True,
+        replay: bool = False,
+        on_result: Optional[Callable[[TriggerResult], None]] = None,
+    ) -> List[TriggerResult]:
+        """Trigger every target mapped to the event, in parallel.
+
+        ``dag_ids`` restricts the fan-out to the named targets, which replay
+        uses so that only the targets that failed are re-triggered. A named
+        target that is no longer mapped, or whose predicates now reject the
+        event, fails with ``ValueError`` rather than being skipped. Each
+        failed target gets its own DLQ entry. Targets with a ``batch`` rule
+        only queue the event (see :meth:`_flush_batch`) unless ``batch`` is
+        false, in which case they get a run of their own. With ``replay``, a
+        409 means the deterministic ``dag_run_id`` was already created and
+        counts as success. ``on_result`` is called as each target finishes
+        or is queued for a batch. Raises ``ValueError`` for unmapped event
+        types.
+        """
+        import uuid
+
+        from .metrics import trigger_counter, trigger_failures_total, triggers_total
 
-    def trigger(self, event: Dict[str, Any]) -> str:
-        """Trigger a DAG run for the given event."""
-        start_time = time.time()
-        triggers_total.inc()
         correlation_id = str(uuid.uuid4())
         extra = {"correlation_id": correlation_id}
-        dag_id = ""
-        dag_run_id = ""
-        last_error: Optional[Exception] = None
+        event_type = event.get("type")
+        mapping = self.mappings.get(event_type)
+        if not mapping:
+            logger.warning("event type %s not mapped", event_type, extra=extra)
+            triggers_total.inc()
+            trigger_counter.labels(status="ignored").inc()
+            trigger_failures_total.inc()
+            error = ValueError(f"event type {event_type} not whitelisted")
+            self._write_dlq(event, "", "", error)
+            raise error
+
+        if dag_ids is not None:
+            dag_ids = list(dict.fromkeys(dag_ids))
+        targets, filtered = self._select_targets(event, dag_ids)
+        missing: List[str] = []
+        if dag_ids is not None:
+            selected = {t["dag_id"] for t in targets}
+            missing = [d for d in dag_ids if d not in selected]
+        else:
+            for dag_id in filtered:
+                if dag_id:
+                    logger.debug("target %s filtered by predicate", dag_id, extra=extra)
+                else:
+                    logger.debug("event filtered by predicate", extra=extra)
+                trigger_counter.labels(status="filtered").inc()
+        if not targets and not missing:
+            return []
+
+        results: Dict[str, TriggerResult] = {}
+        mapped = {t["dag_id"] for t in mapping["targets"]}
+        for dag_id in missing:
+            reason = "filtered by predicate" if dag_id in mapped else "no longer mapped"
+            error = ValueError(f"target {dag_id} {reason} for {event_type}")
+            logger.warning("%s", error, extra=extra)
+            triggers_total.inc()
+            trigger_counter.labels(status="ignored").inc()
+            trigger_failures_total.inc()
+            self._write_dlq(event, dag_id, self.dag_run_id(dag_id, event), error)
+            results[dag_id] = TriggerResult(dag_id, None, error)
+            if on_result is not None:
+                on_result(results[dag_id])
+        direct = []
+        for target in targets:
+            rule = target.get("batch")
+            if batch and rule:
+                self._batches.add(
+                    (event_type, target["dag_id"]),
+                    event,
+                    max_size=rule["max_size"],
+                    max_wait=rule["max_wait"],
+                )
+                trigger_counter.labels(status="batched").inc()
+                result = TriggerResult(target["dag_id"], None)
+                results[target["dag_id"]] = result
+                if on_result is not None:
+                    on_result(result)
+            else:
+                direct.append(target)
+        if direct:
+            for result in self._dispatch(
+                [event], direct, correlation_id, replay=replay, on_result=on_result
+            ):
+                results[result.dag_id] = result
+        return [results[t["dag_id"]] for t in targets] + [results[d] for d in missing]
+
+    def targets_for(
+        self, event: Dict[str, Any], *, dag_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the targets :meth:`trigger_targets` would use for ``event``.
+
+        Unmapped event types have no targets.
+        """
+        return self._select_targets(event, dag_ids)[0]
+
+    def _select_targets(
+        self, event: Dict[str, Any], dag_ids: Optional[Iterable[str]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Apply ``dag_ids`` and predicates; also return what was filtered.
+
+        Filtered targets are reported by ``dag_id``, an event rejected by the
+        mapping-level predicate as ``""``.
+        """
+        event_type = event.get("type")
+        mapping = self.mappings.get(event_type)
+        if not mapping:
+            return [], []
+        memo: Dict[int, bool] = {}
+        predicate = self.predicates.get(event_type)
+        if predicate is not None and not predicate(event, memo):
+            return [], [""]
+
+        selected = set(dag_ids) if dag_ids is not None else None
+        targets, filtered = [], []
+        for target in mapping["targets"]:
+            if selected is not None and target["dag_id"] not in selected:
+                continue
+            target_predicate = self.target_predicates.get((event_type, target["dag_id"]))
+            if target_predicate is not None and not target_predicate(event, memo):
+                filtered.append(target["dag_id"])
+                continue
+            targets.append(target)
+        return targets, filtered
+
+    def _dispatch(
+        self,
+        events: List[Dict[str, Any]],
+        targets: List[Dict[str, Any]],
+        correlation_id: str,
+        *,
+        replay: bool = False,
+        on_result: Optional[Callable[[TriggerResult], None]] = None,
+    ) -> List[TriggerResult]:
+        """Check DAG state and Airflow health, then trigger ``targets``."""
+        rejections = {t["dag_id"]: self._dag_rejection(t["dag_id"]) for t in targets}
+        healthy, health_error = True, ""
+        if any(
+            reason is None or (reason == "paused" and self.unpause_paused_dags)
+            for reason in rejections.values()
+        ):
+            healthy, health_error = self._check_health()
+
+        def run(target: Dict[str, Any]) -> TriggerResult:
+            result = self._trigger_target(
+                events,
+                target,
+                correlation_id,
+                None if healthy else health_error,
+                rejections[target["dag_id"]],
+                replay=replay,
+            )
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return self._fanout([lambda target=target: run(target) for target in targets])
+
+    def _flush_batch(self, key: Tuple[str, str], events: List[Dict[str, Any]]) -> None:
+        """Trigger one run for a batch of events queued for the same target."""
+        import uuid
+
+        event_type, dag_id = key
+        (target,) = [
+            t for t in self.mappings[event_type]["targets"] if t["dag_id"] == dag_id
+        ]
+        correlation_id = str(uuid.uuid4())
+        logger.info(
+            "triggering batch of %s events",
+            len(events),
+            extra={"correlation_id": correlation_id, "dag_id": dag_id},
+        )
+        self._dispatch(events, [target], correlation_id)
+
+    def flush_batches(self) -> None:
+        """Trigger runs for all queued batches now."""
+        self._batches.flush()
+
+    def _batch_conf(
+        self, target: Dict[str, Any], events: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Resolve conf per event and collect the batched field into a list.
+
+        Other conf keys come from the first event, so they should not depend
+        on the event.
+        """
+        rule = target["batch"]
+        confs = [self._resolve_conf(target, event) for event in events]
+        values = [c.pop(rule["field"], None) for c in confs]
+        conf = confs[0]
+        conf[rule["into"]] = values
+        return conf
+
+    def _trigger_target(
+        self,
+        events: List[Dict[str, Any]],
+        target: Dict[str, Any],
+        correlation_id: str,
+        health_error: Optional[str],
+        rejection: Optional[str] = None,
+        *,
+        replay: bool = False,
+    ) -> TriggerResult:
+        """POST one dagRun with retries; failures are recorded, not raised.
+
+        ``events`` holds more than one event for a batched run. Each event
+        gets its own DLQ entry and status update.
+        """
+        import requests
+
+        from .metrics import (
+            latency_ms,
+            trigger_counter,
+            trigger_failures_total,
+            triggers_total,
+        )
+
+        start_time = time.time()
+        triggers_total.inc()
+        request = self._build_request(events, target, correlation_id)
+        dag_id, dag_run_id = request.dag_id, request.dag_run_id
+        result = TriggerResult(dag_id, dag_run_id)
         try:
-            event_type = event.get("type")
-            mapping = self.mappings.get(event_type)
-            if not mapping:
-                logger.warning("event type %s not mapped", event_type, extra=extra)
-                trigger_counter.labels(status="ignored").inc()
-                raise ValueError(f"event type {event_type} not whitelisted")
-
-            dag_id = mapping["dag_id"]
-            conf_template = mapping.get("conf", {})
-            conf = self._resolve_conf(conf_template, event)
-            conf["correlation_id"] = correlation_id
-            dag_run_id = self._dag_run_id(dag_id, event)
-            extra.update({"dag_id": dag_id, "dag_run_id": dag_run_id})
-
-            healthy, error = self._check_health()
-            if not healthy:
+            if rejection is not None and not (
+                rejection == "paused" and self.unpause_paused_dags
+            ):
+                trigger_counter.labels(status="rejected").inc()
+                raise ValueError(f"DAG {dag_id} is {rejection}")
+            if health_error is not None:
                 trigger_counter.labels(status="circuit_open").inc()
-                raise RuntimeError(f"Airflow health check failed: {error}")
-
-            headers = {
-                "Content-Type": "application/json",
-                "X-Correlation-ID": correlation_id,
-            }
-            auth = None
-            if self.token:
-                headers["Authorization"] = f"Bearer {self.token}"
-            elif self.username and self.password:
-                auth = (self.username, self.password)
+                raise RuntimeError(f"Airflow health check failed: {health_error}")
+            if rejection == "paused":
+                self._unpause(dag_id)
+                logger.info("unpaused dag %s", dag_id, extra=request.log_extra)
 
-            url = f"{self.airflow_url}/api/v1/dags/{dag_id}/dagRuns"
-            payload = {"dag_run_id": dag_run_id, "conf": conf}
+            headers = {**self._headers, "X-Correlation-ID": correlation_id}
+            if self.retry_budget is not None:
+                self.retry_budget.record_attempt()
 
             for attempt in range(1, self.max_retries + 1):
                 try:
-                    response = self.session.post(
-                        url,
-                        json=payload,
-                        headers=headers,
-                        auth=auth,
-                        timeout=self.request_timeout,
+                    response, hedged = self._post(
+                        dag_id, request.url, request.payload, headers, self._basic_auth
                     )
                 except requests.RequestException as e:
                     logger.warning(
@@ -168,18 +683,21 @@ class AirflowTriggerAction:
                         dag_id,
                         e,
                         attempt,
-                        extra=extra,
+                        extra=request.log_extra,
                     )
-                    if attempt == self.max_retries:
+                    if not self._retry_allowed(attempt, request.log_extra):
                         trigger_counter.labels(status="error").inc()
                         raise
-                    time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+                    self._backoff(attempt, request.log_extra)
                     continue
 
                 if response.status_code in {401, 403}:
                     trigger_counter.labels(status="unauthorized").inc()
                     logger.error(
-                        "unauthorized to trigger %s: %s", dag_id, response.text, extra=extra
+                        "unauthorized to trigger %s: %s",
+                        dag_id,
+                        response.text,
+                        extra=request.log_extra,
                     )
                     response.raise_for_status()
 
@@ -189,34 +707,45 @@ class AirflowTriggerAction:
                         dag_id,
                         response.status_code,
                         attempt,
-                        extra=extra,
+                        extra=request.log_extra,
                     )
-                    if attempt == self.max_retries:
+                    if not self._retry_allowed(attempt, request.log_extra):
                         trigger_counter.labels(status="error").inc()
                         response.raise_for_status()
-                    time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+                    self._backoff(attempt, request.log_extra)
                     continue
 
-                try:
-                    response.raise_for_status()
-                except requests.HTTPError:
-                    trigger_counter.labels(status="error").inc()
-                    logger.error(
-                        "failed to trigger %s: %s", dag_id, response.text, extra=extra
-                    )
-                    raise
+                if response.status_code == 409 and (hedged or replay):
+                    # The run exists: the other copy of a hedged POST or, on
+                    # replay, the original trigger already created it.
+                    logger.info("dag run already exists", extra=request.log_extra)
+                else:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError:
+                        trigger_counter.labels(status="error").inc()
+                        logger.error(
+                            "failed to trigger %s: %s",
+                            dag_id,
+                            response.text,
+                            extra=request.log_extra,
+                        )
+                        raise
 
                 trigger_counter.labels(status="success").inc()
-                logger.info("triggered dag", extra=extra)
-                return dag_run_id
+                logger.info("triggered dag", extra=request.log_extra)
+                for event in events:
+                    self._record_status(event, dag_id, dag_run_id, "queued")
+                return result
 
             trigger_counter.labels(status="error").inc()
             raise RuntimeError("Failed to trigger DAG after retries")
         except Exception as e:
-            last_error = e
+            result.error = e
             trigger_failures_total.inc()
-            raise
+            for event in events:
+                self._write_dlq(event, dag_id, dag_run_id, e)
+                self._record_status(event, dag_id, dag_run_id, "trigger_failed")
+            return result
         finally:
-            if last_error is not None:
-                self._write_dlq(event, dag_id, dag_run_id, str(last_error))
             latency_ms.observe((time.time() - start_time) * 1000)
@@ -0,0 +1,89 @@
+"""Group events per target so one DAG run handles many of them."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchBuffer:
+    """Collect items per key and flush each group when it is full or due.
+
+    ``flush(key, items)`` runs in the thread whose ``add`` filled the batch,
+    or in a background thread once the oldest item has waited ``max_wait``
+    seconds. The background thread starts with the first ``add``.
+    """
+
+    def __init__(self, flush: Callable[[Hashable, List[Any]], None]) -> None:
+        self._flush = flush
+        # key -> (deadline, items)
+        self._batches: Dict[Hashable, Tuple[float, List[Any]]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(items) for _, items in self._batches.values())
+
+    def add(self, key: Hashable, item: Any, *, max_size: int, max_wait: float) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batch buffer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="batch-flush", daemon=True
+                )
+                self._thread.start()
+            if key not in self._batches:
+                self._batches[key] = (time.monotonic() + max_wait, [])
+                self._cond.notify()
+            items = self._batches[key][1]
+            items.append(item)
+            if len(items) < max_size:
+                return
+            del self._batches[key]
+        self._flush(key, items)
+
+    def _call(self, key: Hashable, items: List[Any]) -> None:
+        try:
+            self._flush(key, items)
+        except Exception:
+            logger.exception("failed to flush batch of %s items for %s", len(items), key)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [key for key, (deadline, _) in self._batches.items() if deadline <= now]
+                ready = [(key, self._batches.pop(key)[1]) for key in due]
+                if not ready:
+                    if self._closed:
+                        return
+                    deadlines = [deadline for deadline, _ in self._batches.values()]
+                    self._cond.wait(min(deadlines) - now if deadlines else None)
+                    continue
+            for key, items in ready:
+                self._call(key, items)
+
+    def flush(self) -> None:
+        """Flush every pending batch now, from the calling thread."""
+        with self._cond:
+            ready = [(key, items) for key, (_, items) in self._batches.items()]
+            self._batches.clear()
+        for key, items in ready:
+            self._call(key, items)
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is still pending."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
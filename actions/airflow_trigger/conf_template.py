@@ -0,0 +1,46 @@
+"""Compile ``conf`` templates into per-event builders.
+
+A string value of the form ``{{ field }}`` is replaced by ``event.get(field)``.
+Compiling walks the template once. Per event, only the top-level dict and the
+containers that hold a placeholder are rebuilt. Constant subtrees are the
+template's own objects, shared by every run's conf, so callers must not mutate
+anything below the top level.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ConfBuilder = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _placeholder(value: Any) -> Optional[str]:
+    if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
+        return value.strip("{} ")
+    return None
+
+
+def _compile(value: Any) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Return a builder for ``value``, or ``None`` if it is constant."""
+    field = _placeholder(value)
+    if field is not None:
+        return lambda event: event.get(field)
+    if isinstance(value, dict):
+        items = [(k, v, _compile(v)) for k, v in value.items()]
+        if all(fn is None for _, _, fn in items):
+            return None
+        return lambda event: {k: v if fn is None else fn(event) for k, v, fn in items}
+    if isinstance(value, list):
+        elements = [(v, _compile(v)) for v in value]
+        if all(fn is None for _, fn in elements):
+            return None
+        return lambda event: [v if fn is None else fn(event) for v, fn in elements]
+    return None
+
+
+def compile_conf(template: Dict[str, Any]) -> ConfBuilder:
+    """Return a function building a fresh top-level conf dict for an event."""
+    items: List[Tuple[str, Any, Optional[Callable[[Dict[str, Any]], Any]]]] = [
+        (k, v, _compile(v)) for k, v in template.items()
+    ]
+    return lambda event: {k: v if fn is None else fn(event) for k, v, fn in items}
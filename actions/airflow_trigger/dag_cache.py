@@ -0,0 +1,189 @@
+"""Background-refreshed cache of Airflow DAG metadata."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DagInfo:
+    """The subset of ``GET /api/v1/dags`` the trigger path needs."""
+
+    dag_id: str
+    is_paused: bool
+    is_active: bool
+
+
+class DagMetadataCache:
+    """Cache of DAG existence and pause state, refreshed in the background.
+
+    A DAG missing from the cache may have been deployed since the last
+    refresh, so a miss triggers one extra refresh before the DAG is reported
+    as not found. Misses share that refresh and start at most one every
+    ``miss_refresh_interval`` seconds. The cache fails open until the first
+    successful refresh and while refreshes fail; callers should then fall
+    back to asking Airflow directly.
+    """
+
+    def __init__(
+        self,
+        airflow_url: str,
+        session: requests.Session,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        refresh_interval: float = 60.0,
+        page_size: int = 100,
+        request_timeout: int = 10,
+        miss_refresh_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.airflow_url = airflow_url.rstrip("/")
+        self.session = session
+        self.headers = headers or {}
+        self.auth = auth
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+        self.request_timeout = request_timeout
+        self.miss_refresh_interval = miss_refresh_interval
+        self._clock = clock
+        self._dags: Optional[Dict[str, DagInfo]] = None
+        # Held for each refresh, so concurrent misses wait for one request.
+        self._refresh_lock = threading.RLock()
+        self._refreshed_at: Optional[float] = None
+        self._refresh_ok = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._dags is not None
+
+    def refresh(self) -> bool:
+        """Fetch all DAG pages and swap them in; return ``False`` on failure."""
+        with self._refresh_lock:
+            self._refreshed_at = self._clock()
+            self._refresh_ok = self._fetch()
+            return self._refresh_ok
+
+    def _fetch(self) -> bool:
+        from .metrics import dag_cache_refresh_failures_total, dag_cache_refresh_seconds
+
+        start = time.perf_counter()
+        try:
+            dags: Dict[str, DagInfo] = {}
+            offset = 0
+            while True:
+                resp = self.session.get(
+                    f"{self.airflow_url}/api/v1/dags",
+                    params={
+                        "limit": self.page_size,
+                        "offset": offset,
+                        "only_active": "false",
+                    },
+                    headers=self.headers,
+                    auth=self.auth,
+                    timeout=self.request_timeout,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+                page = data.get("dags") or []
+                for dag in page:
+                    dags[dag["dag_id"]] = DagInfo(
+                        dag["dag_id"],
+                        bool(dag.get("is_paused")),
+                        bool(dag.get("is_active", True)),
+                    )
+                offset += len(page)
+                if not page or offset >= data.get("total_entries", offset):
+                    break
+        except Exception as e:
+            dag_cache_refresh_failures_total.inc()
+            logger.warning("DAG metadata refresh failed: %s", e)
+            return False
+        finally:
+            dag_cache_refresh_seconds.observe(time.perf_counter() - start)
+        self._dags = dags
+        return True
+
+    def get(self, dag_id: str) -> Optional[DagInfo]:
+        """Return cached metadata for ``dag_id``, recording a hit or miss."""
+        from .metrics import dag_cache_lookups_total
+
+        dags = self._dags
+        info = dags.get(dag_id) if dags is not None else None
+        dag_cache_lookups_total.labels(result="hit" if info else "miss").inc()
+        return info
+
+    def update(self, info: DagInfo) -> None:
+        """Replace one entry, e.g. after unpausing the DAG."""
+        if self._dags is not None:
+            self._dags = {**self._dags, info.dag_id: info}
+
+    def _refresh_after_miss(self) -> bool:
+        """Refresh unless one started recently; return whether the cache is current."""
+        with self._refresh_lock:
+            last = self._refreshed_at
+            if last is None or self._clock() - last >= self.miss_refresh_interval:
+                self.refresh()
+            return self._refresh_ok
+
+    def rejection(self, dag_id: str) -> Optional[str]:
+        """Return why a trigger for ``dag_id`` would fail, if the cache knows.
+
+        Returns ``inactive``, ``paused`` or, if a refresh after the miss
+        still lacks the DAG, ``not found``. Returns ``None`` when the cache
+        cannot tell, so the trigger still reaches Airflow.
+        """
+        if self._dags is None:
+            return None
+        info = self.get(dag_id)
+        if info is None:
+            if not self._refresh_after_miss():
+                return None
+            info = (self._dags or {}).get(dag_id)
+            if info is None:
+                return "not found"
+        if not info.is_active:
+            return "inactive"
+        if info.is_paused:
+            return "paused"
+        return None
+
+    def validate(self, dag_ids: Iterable[str]) -> Dict[str, str]:
+        """Map each problematic ``dag_id`` to the reason it would be rejected."""
+        problems = {}
+        for dag_id in dag_ids:
+            reason = self.rejection(dag_id)
+            if reason:
+                problems[dag_id] = reason
+        return problems
+
+    def start(self) -> None:
+        """Start refreshing every ``refresh_interval`` seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="dag-metadata-cache", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
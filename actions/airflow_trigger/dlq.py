@@ -0,0 +1,281 @@
+"""Dead-letter queue with an offset index sidecar.
+
+Entries are JSON lines in the DLQ file, as before. Every append also writes a
+tab-separated record to ``<dlq>.idx`` with the entry's byte offset and
+length, timestamp, ``dag_id`` and error class (Airflow DAG IDs cannot contain
+whitespace), so queries only scan the index and
+matching entries are read by offset through ``mmap``. Removed entries are
+tombstoned in the index and dropped from the file by :meth:`compact`.
+
+Entries appended without an index (e.g. by older versions) are indexed
+incrementally on the next load.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+INDEX_SUFFIX = ".idx"
+
+
+class IndexRecord(NamedTuple):
+    """Location and filterable fields of one DLQ entry."""
+
+    offset: int
+    length: int
+    timestamp: float
+    dag_id: str
+    error_class: str
+
+
+class DlqEntry(NamedTuple):
+    """A failed trigger; serialized as the same JSON object as dict entries."""
+
+    timestamp: float
+    event: Dict[str, Any]
+    dag_id: str
+    dag_run_id: str
+    error: str
+    error_class: str
+
+
+def error_class(error: BaseException) -> str:
+    """Classify an exception for DLQ filtering (``5xx``, ``timeout``, ...)."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return f"{status // 100}xx"
+    try:
+        import requests
+    except ImportError:  # pragma: no cover - requests is a hard dependency
+        requests = None  # type: ignore[assignment]
+    if requests is not None:
+        if isinstance(error, requests.Timeout):
+            return "timeout"
+        if isinstance(error, requests.ConnectionError):
+            return "connection"
+    return type(error).__name__
+
+
+def _record(offset: int, length: int, entry: Dict[str, Any]) -> IndexRecord:
+    return IndexRecord(
+        offset,
+        length,
+        float(entry.get("timestamp") or 0.0),
+        entry.get("dag_id") or "",
+        entry.get("error_class") or "",
+    )
+
+
+class DeadLetterQueue:
+    """Append-only JSONL DLQ with an incrementally built index."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._lock = threading.Lock()
+        self._records: Optional[List[IndexRecord]] = None
+        self._removed: set = set()
+        self._indexed_end = 0
+
+    def append(self, entry: Union[DlqEntry, Dict[str, Any]]) -> IndexRecord:
+        """Append ``entry`` to the DLQ and its index."""
+        if isinstance(entry, DlqEntry):
+            entry = entry._asdict()
+        data = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+                end = f.tell()
+            record = _record(end - len(data), len(data), entry)
+            self._append_index([record])
+            if self._records is not None:
+                self._add(record)
+        return record
+
+    def _append_index(
+        self, records: Iterable[IndexRecord], tombstones: Iterable[int] = ()
+    ) -> None:
+        lines = [
+            f"{r.offset}\t{r.length}\t{r.timestamp!r}\t{r.dag_id}\t{r.error_class}"
+            for r in records
+        ]
+        lines.extend(f"x\t{offset}" for offset in tombstones)
+        if lines:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def _add(self, record: IndexRecord) -> None:
+        assert self._records is not None
+        self._records.append(record)
+        self._by_dag.setdefault(record.dag_id, []).append(record)
+        self._by_error.setdefault(record.error_class, []).append(record)
+        self._indexed_end = max(self._indexed_end, record.offset + record.length)
+
+    def _reset(self) -> None:
+        self._records = []
+        self._by_dag: Dict[str, List[IndexRecord]] = {}
+        self._by_error: Dict[str, List[IndexRecord]] = {}
+        self._removed = set()
+        self._indexed_end = 0
+
+    def _load(self) -> None:
+        """Load the index, rebuilding or catching up with the DLQ as needed."""
+        if self._records is not None:
+            if self._file_size() == self._indexed_end:
+                return
+        self._reset()
+        records: List[IndexRecord] = []
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) == 5:
+                        offset, length, timestamp, dag_id, klass = fields
+                        records.append(
+                            IndexRecord(
+                                int(offset), int(length), float(timestamp), dag_id, klass
+                            )
+                        )
+                    elif len(fields) == 2 and fields[0] == "x":
+                        self._removed.add(int(fields[1]))
+        except FileNotFoundError:
+            pass
+        size = self._file_size()
+        if records and max(r.offset + r.length for r in records) > size:
+            # The DLQ was truncated or rewritten behind our back: start over.
+            records, self._removed = [], set()
+            try:
+                os.unlink(self.index_path)
+            except FileNotFoundError:
+                pass
+        for record in sorted(records, key=lambda r: r.offset):
+            self._add(record)
+        if self._indexed_end < size:
+            self._append_index(self._scan_from(self._indexed_end))
+
+    def _scan_from(self, start: int) -> List[IndexRecord]:
+        """Index entries appended after ``start`` without an index record."""
+        new: List[IndexRecord] = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if line.strip():
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = {}
+                    record = _record(offset, len(line), entry)
+                    self._add(record)
+                    new.append(record)
+                offset += len(line)
+        return new
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def query(
+        self,
+        *,
+        dag_id: Optional[str] = None,
+        error_class: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[IndexRecord]:
+        """Return index records matching every given filter, oldest first."""
+        with self._lock:
+            self._load()
+            assert self._records is not None
+            candidates = self._records
+            if dag_id is not None:
+                candidates = self._by_dag.get(dag_id, [])
+            if error_class is not None:
+                by_error = self._by_error.get(error_class, [])
+                if len(by_error) < len(candidates):
+                    candidates = by_error
+            removed = set(self._removed)
+        return [
+            r
+            for r in candidates
+            if r.offset not in removed
+            and (dag_id is None or r.dag_id == dag_id)
+            and (error_class is None or r.error_class == error_class)
+            and (since is None or r.timestamp >= since)
+            and (until is None or r.timestamp < until)
+        ]
+
+    def sync(self) -> None:
+        """Flush the DLQ and its index to disk, e.g. before the process exits."""
+        with self._lock:
+            for path in (self.path, self.index_path):
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def count(self, **filters: Any) -> int:
+        return len(self.query(**filters))
+
+    def read(self, records: Iterable[IndexRecord]) -> Iterator[Dict[str, Any]]:
+        """Yield the entries for ``records`` using a memory-mapped DLQ."""
+        records = list(records)
+        if not records:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            for record in records:
+                yield json.loads(mm[record.offset : record.offset + record.length])
+
+    def remove(self, records: Iterable[IndexRecord]) -> None:
+        """Tombstone ``records``; they are skipped by queries from now on."""
+        offsets = [r.offset for r in records]
+        with self._lock:
+            self._append_index([], offsets)
+            self._removed.update(offsets)
+
+    def compact(self) -> None:
+        """Rewrite the DLQ and index without tombstoned entries."""
+        with self._lock:
+            self._load()
+            assert self._records is not None
+            live = [r for r in self._records if r.offset not in self._removed]
+            tmp_path = f"{self.path}.{os.getpid()}.compact"
+            kept: List[IndexRecord] = []
+            with open(tmp_path, "wb") as out:
+                if live:
+                    with open(self.path, "rb") as f, mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ
+                    ) as mm:
+                        for record in live:
+                            kept.append(
+                                IndexRecord(
+                                    out.tell(),
+                                    record.length,
+                                    record.timestamp,
+                                    record.dag_id,
+                                    record.error_class,
+                                )
+                            )
+                            out.write(mm[record.offset : record.offset + record.length])
+            os.replace(tmp_path, self.path)
+            try:
+                os.unlink(self.index_path)
+            except FileNotFoundError:
+                pass
+            self._append_index(kept)
+            self._reset()
+            for record in kept:
+                self._add(record)
@@ -0,0 +1,182 @@
+"""Hedged requests for idempotent dagRun POSTs.
+
+A hedge is a second copy of a request fired when the first has not answered
+within a high percentile of recent latency. Because ``dag_run_id`` is
+deterministic, Airflow rejects the slower copy with 409, which the caller
+treats as success.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per key."""
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Return the ``q`` quantile for ``key``, or ``None`` without enough data."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of primary requests.
+
+    Every primary request earns ``ratio`` tokens (up to ``burst``); each hedge
+    spends one.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+def _succeeded(response: Any) -> bool:
+    return response.status_code < 400 or response.status_code == 409
+
+
+class _Attempt:
+    """One copy of a request, timed from when a pool thread picks it up."""
+
+    def __init__(self, request: Callable[[], Any]) -> None:
+        self.request = request
+        self.started = threading.Event()
+        self.start = 0.0
+
+    def __call__(self) -> Any:
+        self.start = time.perf_counter()
+        self.started.set()
+        return self.request()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+class Hedger:
+    """Run a request, hedging it once it is slower than recent latency.
+
+    Both copies run on a pool of ``max_workers`` threads; size it for two
+    requests per concurrent caller. The hedge delay and recorded latency
+    start when a copy begins running, so time spent queued for a pool thread
+    neither triggers a hedge nor inflates the percentile.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        budget_ratio: float = 0.1,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 32,
+    ) -> None:
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+        self.budget = HedgeBudget(budget_ratio)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="airflow-hedge"
+        )
+
+    def delay(self, key: str) -> Optional[float]:
+        """Return how long to wait before hedging ``key``, if known yet."""
+        observed = self.latency.percentile(key, self.percentile, self.min_samples)
+        if observed is None:
+            return None
+        return max(observed, self.min_delay)
+
+    def call(self, key: str, request: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``request`` and return ``(response, hedged)``.
+
+        When a hedge was sent the first successful response wins, and a 409
+        from either copy counts as success. Otherwise the last response or
+        exception is returned or raised.
+        """
+        from .metrics import hedge_budget_exhausted_total, hedged_requests_total
+
+        self.budget.earn()
+        first = _Attempt(request)
+        primary = self._executor.submit(first)
+        delay = self.delay(key)
+        if delay is not None:
+            first.started.wait()
+            delay = max(delay - first.elapsed(), 0.0)
+        try:
+            response = primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        else:
+            self.latency.record(key, first.elapsed())
+            return response, False
+
+        if not self.budget.try_spend():
+            hedge_budget_exhausted_total.inc()
+            response = primary.result()
+            self.latency.record(key, first.elapsed())
+            return response, False
+
+        second = _Attempt(request)
+        hedge = self._executor.submit(second)
+        pending = {primary, hedge}
+        fallback: Any = None
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if _succeeded(response):
+                    winner = "hedge" if future is hedge else "primary"
+                    hedged_requests_total.labels(winner=winner).inc()
+                    attempt = second if future is hedge else first
+                    self.latency.record(key, attempt.elapsed())
+                    return response, True
+                fallback = response
+        hedged_requests_total.labels(winner="none").inc()
+        if fallback is not None:
+            return fallback, True
+        assert error is not None
+        raise error
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,242 @@
+"""Keyed dispatch: ordered per key, parallel across keys.
+
+Each event is hashed by a key (the entity URN by default) to one of N lanes.
+A lane runs its events one at a time in submission order, so two events for
+the same dataset never trigger out of order, while different datasets run in
+parallel.
+
+Lanes are threads by default. In ``shards`` mode each lane is a separate
+process, so CPU-bound work (hashing, JSON) scales past the GIL. Handlers are
+built by a ``handler_factory``: once in ``threads`` mode, and once inside
+every shard process in ``shards`` mode, where the factory and the events,
+results and exceptions must be picklable.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Any]
+KeyFunc = Callable[[Dict[str, Any]], Optional[str]]
+
+_STOP = None
+
+
+def key_getter(key: Union[str, KeyFunc]) -> KeyFunc:
+    """Return ``key`` if callable, else a getter for the dotted event path."""
+    if callable(key):
+        return key
+    path = key.split(".")
+
+    def get(event: Dict[str, Any]) -> Optional[str]:
+        current: Any = event
+        for part in path:
+            if not isinstance(current, dict):
+                return None
+            current = current.get(part)
+        return None if current is None else str(current)
+
+    return get
+
+
+def _picklable_error(error: BaseException) -> BaseException:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+def _shard_main(
+    handler_factory: Callable[[], Handler],
+    tasks: "multiprocessing.Queue[Any]",
+    results: "multiprocessing.Queue[Any]",
+) -> None:
+    """Run one shard: build a handler, then process tasks in order."""
+    handler = handler_factory()
+    while True:
+        task = tasks.get()
+        if task is _STOP:
+            return
+        task_id, event = task
+        try:
+            results.put((task_id, True, handler(event)))
+        except Exception as e:
+            results.put((task_id, False, _picklable_error(e)))
+
+
+class KeyedExecutor:
+    """Dispatch events to lanes by key with bounded per-lane queues."""
+
+    def __init__(
+        self,
+        handler_factory: Callable[[], Handler],
+        *,
+        lanes: int = 8,
+        key: Union[str, KeyFunc] = "entityUrn",
+        queue_size: int = 1000,
+        mode: str = "threads",
+    ) -> None:
+        if mode not in {"threads", "shards"}:
+            raise ValueError(f"unknown mode {mode!r}")
+        if lanes < 1:
+            raise ValueError("lanes must be positive")
+        self.lanes = lanes
+        self.mode = mode
+        self._key = key_getter(key)
+        self._round_robin = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._depth = [0] * lanes
+        self._closed = False
+        if mode == "threads":
+            handler = handler_factory()
+            self._queues: List[Any] = [queue.Queue(queue_size) for _ in range(lanes)]
+            self._workers: List[Any] = [
+                threading.Thread(
+                    target=self._lane_main,
+                    args=(lane, handler),
+                    name=f"keyed-lane-{lane}",
+                    daemon=True,
+                )
+                for lane in range(lanes)
+            ]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            self._results = ctx.Queue()
+            self._queues = [ctx.Queue(queue_size) for _ in range(lanes)]
+            self._workers = [
+                ctx.Process(
+                    target=_shard_main,
+                    args=(handler_factory, self._queues[lane], self._results),
+                    name=f"keyed-shard-{lane}",
+                    daemon=True,
+                )
+                for lane in range(lanes)
+            ]
+            self._collector = threading.Thread(
+                target=self._collect, name="keyed-shard-results", daemon=True
+            )
+            self._collector.start()
+        for worker in self._workers:
+            worker.start()
+
+    def lane_for(self, event: Dict[str, Any]) -> int:
+        """Return the lane for ``event``; keyless events are spread round-robin."""
+        key = self._key(event)
+        if key is None:
+            return next(self._round_robin) % self.lanes
+        return zlib.crc32(key.encode("utf-8")) % self.lanes
+
+    def submit(self, event: Dict[str, Any], timeout: Optional[float] = None) -> Future:
+        """Queue ``event`` on its lane and return a future for the result.
+
+        Blocks while the lane's queue is full; raises ``queue.Full`` if that
+        lasts longer than ``timeout`` seconds.
+        """
+        from .metrics import keyed_lane_depth, keyed_lane_events_total
+
+        if self._closed:
+            raise RuntimeError("executor is shut down")
+        lane = self.lane_for(event)
+        future: Future = Future()
+        task_id = next(self._task_ids)
+        with self._lock:
+            self._pending[task_id] = future
+            self._depth[lane] += 1
+            keyed_lane_depth.labels(lane=str(lane)).set(self._depth[lane])
+        future.add_done_callback(lambda _: self._done(lane))
+        try:
+            self._queues[lane].put((task_id, event), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(task_id, None)
+            future.cancel()
+            raise
+        keyed_lane_events_total.labels(lane=str(lane)).inc()
+        return future
+
+    def _done(self, lane: int) -> None:
+        from .metrics import keyed_lane_depth
+
+        with self._lock:
+            self._depth[lane] -= 1
+            keyed_lane_depth.labels(lane=str(lane)).set(self._depth[lane])
+
+    def _start(self, task_id: int) -> bool:
+        """Mark the task's future running; drop it if it was cancelled."""
+        with self._lock:
+            future = self._pending.get(task_id)
+            if future is not None and not future.set_running_or_notify_cancel():
+                del self._pending[task_id]
+                return False
+        return True
+
+    def _resolve(self, task_id: int, ok: bool, value: Any) -> None:
+        with self._lock:
+            future = self._pending.pop(task_id, None)
+        if future is None or future.cancelled():
+            return
+        if not future.running() and not future.set_running_or_notify_cancel():
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _lane_main(self, lane: int, handler: Handler) -> None:
+        lane_queue = self._queues[lane]
+        while True:
+            task = lane_queue.get()
+            if task is _STOP:
+                return
+            task_id, event = task
+            if not self._start(task_id):
+                continue
+            try:
+                result = handler(event)
+            except Exception as e:
+                self._resolve(task_id, False, e)
+            else:
+                self._resolve(task_id, True, result)
+
+    def _collect(self) -> None:
+        while True:
+            item = self._results.get()
+            if item is _STOP:
+                return
+            self._resolve(*item)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting events; with ``wait``, drain queued events first.
+
+        Without ``wait`` this never blocks: a lane whose queue is full is left
+        to finish its queued events (cancelled ones are skipped in ``threads``
+        mode) and its daemon worker is abandoned.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for lane_queue in self._queues:
+            try:
+                lane_queue.put(_STOP, block=wait)
+            except queue.Full:
+                pass
+        if not wait:
+            return
+        for worker in self._workers:
+            worker.join()
+        if self.mode == "shards":
+            self._results.put(_STOP)
+            self._collector.join()
@@ -0,0 +1,268 @@
+"""Graceful shutdown for the trigger action.
+
+``LifecycleManager`` owns intake: events go through :meth:`submit` to a
+:class:`~.keyed_executor.KeyedExecutor`, so events for the same entity are
+triggered in order. On SIGTERM (or :meth:`shutdown`) it stops accepting
+events, tells the action to abandon pending retries, and waits up to
+``drain_timeout`` seconds (default ``$SHUTDOWN_DRAIN_TIMEOUT``, else 30) for
+queued and in-flight events. Each target that has not finished by then gets
+a DLQ entry with its ``dag_id`` and ``dag_run_id``, so it can be replayed
+after restart. Then it flushes
+batches, run-status updates, log listeners and the DLQ file, and optionally
+pushes metrics to a Prometheus Pushgateway.
+
+A target still running at the deadline may be triggered after its entry is
+written. Because ``dag_run_id`` is deterministic, replaying that entry gets a
+409 from Airflow, which replay counts as success instead of creating a second
+run.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .dlq import DlqEntry, error_class
+from .keyed_executor import KeyedExecutor, KeyFunc, key_getter
+from .status_emitter import RunStatusEmitter
+
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+    from .action import AirflowTriggerAction, TriggerResult
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT_ENV = "SHUTDOWN_DRAIN_TIMEOUT"
+DEFAULT_DRAIN_TIMEOUT = 30.0
+
+# An accepted event and the dag_ids of its targets that have finished.
+_Task = Tuple[Dict[str, Any], Set[str]]
+
+
+class ShuttingDown(RuntimeError):
+    """Raised by :meth:`LifecycleManager.submit` once shutdown has begun."""
+
+
+@dataclass
+class ShutdownReport:
+    """What happened to the work that was in flight at shutdown."""
+
+    drained: int = 0
+    persisted: int = 0
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+
+class LifecycleManager:
+    """Run events through an action and drain them on shutdown."""
+
+    def __init__(
+        self,
+        action: AirflowTriggerAction,
+        *,
+        lanes: int = 8,
+        key: Union[str, KeyFunc] = "entityUrn",
+        queue_size: int = 1000,
+        drain_timeout: Optional[float] = None,
+        status_emitter: Optional[RunStatusEmitter] = None,
+        log_listeners: Iterable[QueueListener] = (),
+        pushgateway: Optional[str] = None,
+        job: str = "airflow-trigger",
+    ) -> None:
+        self.action = action
+        if drain_timeout is None:
+            drain_timeout = float(os.environ.get(DRAIN_TIMEOUT_ENV) or DEFAULT_DRAIN_TIMEOUT)
+        self.drain_timeout = drain_timeout
+        self.status_emitter = status_emitter or action.status_emitter
+        self.log_listeners = list(log_listeners)
+        self.pushgateway = pushgateway
+        self.job = job
+        event_key = key_getter(key)
+        self._executor = KeyedExecutor(
+            lambda: self._handle,
+            lanes=lanes,
+            key=lambda task: event_key(task[0]),
+            queue_size=queue_size,
+        )
+        # Held while submitting, which may block on a full lane; ``_lock``
+        # only guards ``_inflight`` so lanes can always complete futures.
+        self._intake_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Future, _Task] = {}
+        self._accepting = True
+        self._requested = threading.Event()
+        self._report: Optional[ShutdownReport] = None
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def submit(self, event: Dict[str, Any]) -> Future:
+        """Queue ``event`` for triggering; raise ``ShuttingDown`` after SIGTERM.
+
+        Blocks while the event's lane is full. A source that gets
+        ``ShuttingDown`` should stop consuming and leave the event
+        uncommitted, so it is redelivered after restart.
+        """
+        task: _Task = (event, set())
+        with self._intake_lock:
+            if not self._accepting:
+                raise ShuttingDown("not accepting events, shutting down")
+            future = self._executor.submit(task)
+            with self._lock:
+                self._inflight[future] = task
+        future.add_done_callback(self._done)
+        return future
+
+    def _handle(self, task: _Task) -> List[TriggerResult]:
+        event, finished = task
+
+        def on_result(result: TriggerResult) -> None:
+            finished.add(result.dag_id)
+
+        return self.action.trigger_targets(event, on_result=on_result)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(future, None)
+
+    def install_signal_handlers(
+        self, signals: Iterable[int] = (signal.SIGTERM, signal.SIGINT)
+    ) -> Dict[int, Any]:
+        """Request shutdown on ``signals``; return the previous handlers.
+
+        Must be called from the main thread. The handler only stops intake
+        and sets a flag. The main thread then calls
+        :meth:`wait_for_shutdown` to drain.
+        """
+        previous = {}
+        for signum in signals:
+            previous[signum] = signal.signal(signum, self._on_signal)
+        return previous
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        logger.info("received signal %s, shutting down", signum)
+        self.request_shutdown()
+
+    def request_shutdown(self) -> None:
+        """Stop intake and wake :meth:`wait_for_shutdown`; safe in signal handlers."""
+        self._accepting = False
+        self._requested.set()
+
+    def wait_for_shutdown(self, timeout: Optional[float] = None) -> Optional[ShutdownReport]:
+        """Block until shutdown is requested, then drain and return the report."""
+        if not self._requested.wait(timeout):
+            return None
+        return self.shutdown()
+
+    def shutdown(self) -> ShutdownReport:
+        """Drain within ``drain_timeout``, persist leftovers and flush outputs."""
+        if self._report is not None:
+            return self._report
+        start = time.monotonic()
+        self._accepting = False
+        with self._intake_lock, self._lock:
+            pending = list(self._inflight.items())
+        self._requested.set()
+        self.action.begin_shutdown()
+        report = ShutdownReport()
+
+        wait([future for future, _ in pending], timeout=self.drain_timeout)
+        leftovers = self._leftovers()
+        report.drained = len(pending) - len(leftovers)
+        if leftovers:
+            report.timed_out = True
+            self._persist(leftovers, report)
+        self._executor.shutdown(wait=False)
+        logger.info(
+            "drained %s events, persisted %s to DLQ",
+            report.drained,
+            report.persisted,
+        )
+        self._flush(report.timed_out)
+        report.elapsed = time.monotonic() - start
+        self._report = report
+        return report
+
+    def _leftovers(self) -> List[_Task]:
+        """Cancel queued work and return the events that did not finish."""
+        with self._lock:
+            pending = list(self._inflight.items())
+        leftovers = []
+        for future, task in pending:
+            if future.done() and not future.cancelled():
+                continue
+            future.cancel()
+            leftovers.append(task)
+        return leftovers
+
+    def _persist(self, tasks: List[_Task], report: ShutdownReport) -> None:
+        """Write a DLQ entry per unfinished target of each leftover event."""
+        dlq = self.action.dlq
+        if dlq is None:
+            logger.error("no DLQ configured, dropping %s undrained events", len(tasks))
+            return
+        error = RuntimeError("not drained before shutdown deadline")
+        for event, finished in tasks:
+            dag_ids = [
+                target["dag_id"]
+                for target in self.action.targets_for(event)
+                if target["dag_id"] not in finished
+            ]
+            for dag_id in dag_ids:
+                dlq.append(
+                    DlqEntry(
+                        time.time(),
+                        event,
+                        dag_id,
+                        self.action.dag_run_id(dag_id, event),
+                        str(error),
+                        error_class(error),
+                    )
+                )
+            if dag_ids:
+                report.persisted += 1
+
+    def _flush(self, timed_out: bool) -> None:
+        """Flush batches, status updates, logs, the DLQ and metrics."""
+        steps: List[Callable[[], None]] = []
+        if not timed_out:
+            # Closing waits for fan-out threads; skip it if some are stuck.
+            steps.append(self.action.close)
+        else:
+            steps.append(self.action.flush_batches)
+        if self.status_emitter is not None:
+            steps.append(self.status_emitter.close)
+        if self.action.dlq is not None:
+            steps.append(self.action.dlq.sync)
+        if self.pushgateway:
+            steps.append(self._push_metrics)
+        steps.extend(listener.stop for listener in self.log_listeners)
+        for step in steps:
+            try:
+                step()
+            except Exception:
+                logger.exception("shutdown step %s failed", getattr(step, "__qualname__", step))
+
+    def _push_metrics(self) -> None:
+        from prometheus_client import REGISTRY, push_to_gateway
+
+        push_to_gateway(self.pushgateway, job=self.job, registry=REGISTRY)
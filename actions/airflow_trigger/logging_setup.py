@@ -0,0 +1,156 @@
+"""Opt-in non-blocking JSON logging for the trigger path.
+
+``configure_logging`` routes the action's loggers through a
+``QueueHandler`` so callers only enqueue records; a background
+``QueueListener`` thread formats them as JSON and writes them out. Repeated
+warnings per ``dag_id`` can be rate limited, with a count of suppressed
+records attached to the next one that gets through.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import IO, Any, Dict, Optional, Tuple
+
+CONTEXT_FIELDS = ("correlation_id", "dag_id", "dag_run_id")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit repeated warnings per ``dag_id`` and message.
+
+    At most ``burst`` records per key pass in each ``interval`` seconds; after
+    that, every ``sample_every``-th record still passes (``0`` drops them
+    all). The first record let through after suppression carries a
+    ``suppressed`` attribute with the number of records dropped. Records
+    below ``level`` or without a ``dag_id`` always pass.
+    """
+
+    def __init__(
+        self,
+        *,
+        burst: int = 5,
+        interval: float = 60.0,
+        sample_every: int = 0,
+        level: int = logging.WARNING,
+        clock: Any = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.level = level
+        self._clock = clock
+        # key -> [window start, passed in window, seen beyond burst, suppressed]
+        self._state: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        dag_id = getattr(record, "dag_id", None)
+        if record.levelno < self.level or not dag_id:
+            return True
+        key = (dag_id, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.interval:
+                suppressed = state[3] if state else 0
+                state = self._state[key] = [now, 0, 0, suppressed]
+            if state[1] < self.burst:
+                allowed = True
+            else:
+                state[2] += 1
+                allowed = bool(self.sample_every) and state[2] % self.sample_every == 0
+            if allowed:
+                state[1] += 1
+                suppressed, state[3] = state[3], 0
+            else:
+                state[3] += 1
+        if not allowed:
+            from .metrics import log_records_suppressed_total
+
+            log_records_suppressed_total.labels(dag_id=dag_id).inc()
+            return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of raising when full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Defer formatting to the listener thread; only merge args so the
+        # record no longer references mutable caller state.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            from .metrics import log_records_dropped_total
+
+            log_records_dropped_total.inc()
+
+
+def configure_logging(
+    *,
+    stream: Optional[IO[str]] = None,
+    level: int = logging.INFO,
+    logger_name: str = "actions.airflow_trigger",
+    queue_size: int = 10000,
+    rate_limit: Optional[RateLimitFilter] = None,
+) -> logging.handlers.QueueListener:
+    """Route ``logger_name`` through a queue to a JSON stream handler.
+
+    Returns the started listener; call ``stop()`` on shutdown to flush the
+    queue. When the queue is full, records are dropped rather than blocking
+    the trigger path.
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    if rate_limit is not None:
+        queue_handler.addFilter(rate_limit)
+    logger = logging.getLogger(logger_name)
+    for existing in list(logger.handlers):
+        if isinstance(existing, logging.handlers.QueueHandler):
+            logger.removeHandler(existing)
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    listener = logging.handlers.QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
@@ -0,0 +1,227 @@
+"""Load, validate and cache event → DAG mapping rules."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from .predicates import PredicateError, parse
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 4
+CACHE_SUFFIX = ".cache.json"
+CACHE_PATH_ENV = "MAPPINGS_CACHE_PATH"
+
+
+def default_cache_path(mappings_path: str) -> str:
+    """Return the cache location used when none is configured.
+
+    ``$MAPPINGS_CACHE_PATH`` wins when set, for deployments whose mappings
+    directory is read-only; otherwise the cache sits next to the source.
+    """
+    return os.environ.get(CACHE_PATH_ENV) or f"{mappings_path}{CACHE_SUFFIX}"
+
+
+def _parse_yaml(text: str) -> Any:
+    """Parse YAML with the libyaml-backed loader when it is available."""
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+def _validate_predicate(when: Any, where: str) -> None:
+    if when is None:
+        return
+    try:
+        parse(when)
+    except PredicateError as e:
+        raise ValueError(f"invalid predicate for {where}: {e}") from e
+
+
+def _validate_batch(batch: Any, conf: Dict[str, Any], where: str) -> Dict[str, Any]:
+    if not isinstance(batch, dict):
+        raise ValueError(f"batch for {where} must be a mapping")
+    for key in ("field", "into"):
+        if not isinstance(batch.get(key), str) or not batch[key]:
+            raise ValueError(f"batch for {where} requires {key}")
+    if batch["field"] not in conf:
+        raise ValueError(f"batch field {batch['field']} for {where} must be a conf key")
+    max_size = batch.get("max_size", 100)
+    if isinstance(max_size, bool) or not isinstance(max_size, int) or max_size < 1:
+        raise ValueError(f"batch max_size for {where} must be a positive integer")
+    max_wait = batch.get("max_wait", 5.0)
+    if isinstance(max_wait, bool) or not isinstance(max_wait, (int, float)) or max_wait <= 0:
+        raise ValueError(f"batch max_wait for {where} must be a positive number")
+    return {
+        "field": batch["field"],
+        "into": batch["into"],
+        "max_size": max_size,
+        "max_wait": float(max_wait),
+    }
+
+
+def _validate_target(target: Any, where: str) -> Dict[str, Any]:
+    if not isinstance(target, dict):
+        raise ValueError(f"target for {where} must be a mapping")
+    dag_id = target.get("dag_id")
+    if not isinstance(dag_id, str) or not dag_id:
+        raise ValueError(f"mapping for {where} requires a dag_id")
+    conf = target.get("conf") or {}
+    if not isinstance(conf, dict):
+        raise ValueError(f"conf for {where} must be a mapping")
+    _validate_predicate(target.get("when"), f"{where} -> {dag_id}")
+    normalized = {"dag_id": dag_id, "conf": conf}
+    if target.get("when") is not None:
+        normalized["when"] = target["when"]
+    if target.get("batch") is not None:
+        normalized["batch"] = _validate_batch(target["batch"], conf, f"{where} -> {dag_id}")
+    return normalized
+
+
+def validate_mappings(raw: Any) -> Dict[str, Dict[str, Any]]:
+    """Validate raw mappings and return them in normalized form.
+
+    A rule either names a single ``dag_id`` (with optional ``conf`` and
+    ``batch``) or lists several ``targets``, each with its own ``dag_id``,
+    ``conf`` and optional ``when`` and ``batch``. Both forms normalize to
+    ``{"targets": [...]}`` plus the rule's own optional ``when``.
+
+    Raises ``ValueError`` describing the first invalid rule found, including
+    rules holding values JSON cannot represent.
+    """
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("mappings must be a mapping of event type to rule")
+    mappings: Dict[str, Dict[str, Any]] = {}
+    for event_type, rule in raw.items():
+        if not isinstance(rule, dict):
+            raise ValueError(f"mapping for {event_type} must be a mapping")
+        if "targets" in rule:
+            if "dag_id" in rule:
+                raise ValueError(
+                    f"mapping for {event_type} cannot set both dag_id and targets"
+                )
+            if not isinstance(rule["targets"], list) or not rule["targets"]:
+                raise ValueError(f"targets for {event_type} must be a non-empty list")
+            targets = [_validate_target(t, str(event_type)) for t in rule["targets"]]
+        else:
+            targets = [
+                _validate_target(
+                    {
+                        "dag_id": rule.get("dag_id"),
+                        "conf": rule.get("conf"),
+                        "batch": rule.get("batch"),
+                    },
+                    str(event_type),
+                )
+            ]
+        dag_ids = [t["dag_id"] for t in targets]
+        if len(set(dag_ids)) != len(dag_ids):
+            raise ValueError(f"targets for {event_type} must have distinct dag_ids")
+        _validate_predicate(rule.get("when"), str(event_type))
+        normalized: Dict[str, Any] = {"targets": targets}
+        if rule.get("when") is not None:
+            normalized["when"] = rule["when"]
+        try:
+            json.dumps(normalized)
+        except (TypeError, ValueError) as e:
+            # e.g. an unquoted YAML date; conf is sent to Airflow as JSON.
+            raise ValueError(
+                f"mapping for {event_type} is not JSON-serializable: {e}"
+            ) from e
+        mappings[str(event_type)] = normalized
+    return mappings
+
+
+def _read_cache(cache_path: str, digest: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return cached mappings, or ``None`` if missing, stale or unreadable."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    if digest is not None and data.get("sha256") != digest:
+        return None
+    return data.get("mappings")
+
+
+def _write_cache(cache_path: str, digest: str, mappings: Dict[str, Any]) -> None:
+    """Atomically write the compiled cache; failures are logged, not raised."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "sha256": digest, "mappings": mappings}, f
+            )
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("could not write mappings cache %s: %s", cache_path, e)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def compile_mappings(
+    mappings_path: str, cache_path: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Parse and validate ``mappings_path`` and (re)write its cache."""
+    cache_path = cache_path or default_cache_path(mappings_path)
+    with open(mappings_path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    mappings = validate_mappings(_parse_yaml(source.decode("utf-8")))
+    _write_cache(cache_path, digest, mappings)
+    return mappings
+
+
+def load_mappings(
+    mappings_path: str, cache_path: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Load mappings, preferring a cache whose hash matches the source.
+
+    The YAML source is only parsed when the cache is missing or stale. When
+    the source file does not exist the cache is used as-is, so deployments can
+    ship only the precompiled cache.
+    """
+    cache_path = cache_path or default_cache_path(mappings_path)
+    try:
+        with open(mappings_path, "rb") as f:
+            source = f.read()
+    except FileNotFoundError:
+        cached = _read_cache(cache_path, None)
+        if cached is None:
+            raise
+        return cached
+    digest = hashlib.sha256(source).hexdigest()
+    cached = _read_cache(cache_path, digest)
+    if cached is not None:
+        return cached
+    mappings = validate_mappings(_parse_yaml(source.decode("utf-8")))
+    _write_cache(cache_path, digest, mappings)
+    return mappings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompile a mappings cache")
+    parser.add_argument("mappings")
+    parser.add_argument(
+        "--cache", help=f"cache path (default: ${CACHE_PATH_ENV} or <mappings>{CACHE_SUFFIX})"
+    )
+    args = parser.parse_args()
+    mappings = compile_mappings(args.mappings, args.cache)
+    print(f"compiled {len(mappings)} rules to {args.cache or default_cache_path(args.mappings)}")
+
+
+if __name__ == "__main__":
+    main()
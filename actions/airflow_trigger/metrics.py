@@ -0,0 +1,68 @@
+"""Prometheus metrics for the Airflow trigger action.
+
+Kept in their own module so ``prometheus_client`` is only imported once the
+action actually records a metric.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+trigger_counter = Counter(
+    "airflow_trigger_total", "Total Airflow trigger events", ["status"]
+)
+
+triggers_total = Counter("triggers_total", "Total trigger attempts")
+trigger_failures_total = Counter(
+    "trigger_failures_total", "Total trigger failures"
+)
+latency_ms = Histogram("latency_ms", "Trigger latency in milliseconds")
+
+dag_cache_refresh_seconds = Histogram(
+    "dag_cache_refresh_seconds", "DAG metadata cache refresh duration in seconds"
+)
+dag_cache_refresh_failures_total = Counter(
+    "dag_cache_refresh_failures_total", "Failed DAG metadata cache refreshes"
+)
+dag_cache_lookups_total = Counter(
+    "dag_cache_lookups_total", "DAG metadata cache lookups", ["result"]
+)
+
+hedged_requests_total = Counter(
+    "hedged_requests_total", "Hedged dagRun POSTs by winning copy", ["winner"]
+)
+hedge_budget_exhausted_total = Counter(
+    "hedge_budget_exhausted_total", "Hedges skipped because the budget was spent"
+)
+
+retry_budget_retries_total = Counter(
+    "retry_budget_retries_total", "Retries checked against the retry budget", ["outcome"]
+)
+retry_budget_utilization = Gauge(
+    "retry_budget_utilization", "Share of the retry budget used in the current window"
+)
+
+keyed_lane_depth = Gauge(
+    "keyed_lane_depth", "Events queued or running per keyed executor lane", ["lane"]
+)
+keyed_lane_events_total = Counter(
+    "keyed_lane_events_total", "Events dispatched per keyed executor lane", ["lane"]
+)
+
+log_records_suppressed_total = Counter(
+    "log_records_suppressed_total", "Log records suppressed by rate limiting", ["dag_id"]
+)
+log_records_dropped_total = Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+status_updates_total = Counter(
+    "status_updates_total", "Run-status updates for DataHub by outcome", ["outcome"]
+)
+status_pending = Gauge(
+    "status_pending", "Run-status updates buffered for DataHub"
+)
+status_flush_seconds = Histogram(
+    "status_flush_seconds", "Duration of batched run-status writes to GMS in seconds"
+)
+status_tracked_runs = Gauge(
+    "status_tracked_runs", "Triggered runs polled for their final state"
+)
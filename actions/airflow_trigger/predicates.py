@@ -0,0 +1,305 @@
+"""Predicate expressions for filtering events in mappings.
+
+A mapping rule may carry a ``when`` expression that must hold for the event
+to trigger its DAG::
+
+    aspectName == "schemaMetadata" and platform in [snowflake, bigquery]
+
+Grammar (lowest to highest precedence)::
+
+    expr       := and_expr ("or" and_expr)*
+    and_expr   := not_expr ("and" not_expr)*
+    not_expr   := "not" not_expr | "(" expr ")" | comparison
+    comparison := operand [op literal | ("in" | "not in") operand]
+    op         := "==" | "!=" | "<" | "<=" | ">" | ">="
+    operand    := field | literal | "[" literal ("," literal)* "]"
+
+Fields are dotted paths into the event (``entity.platform``); a missing field
+resolves to ``None``. Literals are quoted strings, numbers, ``true``,
+``false`` and ``null``; bare words inside a list are strings. A bare word
+on the right of ``==``, ``<`` and the like is rejected rather than read as a
+field, since ``aspectName == schemaMetadata`` almost always means a string.
+
+Expressions are compiled once into closures. A :class:`PredicateCompiler`
+interns identical comparisons so that, within one evaluation scope, a term
+shared by several predicates is evaluated only once per event.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Memo = Dict[int, bool]
+Predicate = Callable[[Dict[str, Any], Memo], bool]
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+
+_KEYWORDS = {"and", "or", "not", "in"}
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_MISSING = object()
+
+
+class PredicateError(ValueError):
+    """Raised when a predicate expression cannot be parsed."""
+
+
+def _tokenize(expr: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = _TOKEN_RE.match(expr, pos)
+        if not match or match.end() == pos:
+            raise PredicateError(f"unexpected input at {pos} in {expr!r}")
+        kind = match.lastgroup or ""
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a small tuple-based AST."""
+
+    def __init__(self, expr: str) -> None:
+        self.expr = expr
+        self.tokens = _tokenize(expr)
+        self.pos = 0
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _accept(self, value: str) -> bool:
+        token = self._peek()
+        if token and token[1] == value and token[0] in {"op", "name"}:
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        if not self._accept(value):
+            raise PredicateError(f"expected {value!r} in {self.expr!r}")
+
+    def parse(self) -> Tuple[Any, ...]:
+        if not self.tokens:
+            raise PredicateError("empty predicate")
+        node = self._or()
+        if self._peek() is not None:
+            raise PredicateError(f"unexpected {self._peek()[1]!r} in {self.expr!r}")
+        return node
+
+    def _or(self) -> Tuple[Any, ...]:
+        nodes = [self._and()]
+        while self._accept("or"):
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def _and(self) -> Tuple[Any, ...]:
+        nodes = [self._not()]
+        while self._accept("and"):
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def _not(self) -> Tuple[Any, ...]:
+        if self._accept("not"):
+            return ("not", self._not())
+        if self._accept("("):
+            node = self._or()
+            self._expect(")")
+            return node
+        return self._comparison()
+
+    def _comparison(self) -> Tuple[Any, ...]:
+        left = self._operand()
+        token = self._peek()
+        if token and token[0] == "op" and token[1] in _COMPARATORS:
+            self.pos += 1
+            right = self._peek()
+            if right and right[0] == "name" and right[1] not in _CONSTANTS:
+                raise PredicateError(
+                    f"bare word {right[1]!r} after {token[1]!r} in {self.expr!r}; "
+                    "quote string literals"
+                )
+            return ("cmp", token[1], left, self._operand())
+        if self._accept("in"):
+            return ("cmp", "in", left, self._operand())
+        if token and token[1] == "not" and self.pos + 1 < len(self.tokens):
+            if self.tokens[self.pos + 1][1] == "in":
+                self.pos += 2
+                return ("cmp", "not in", left, self._operand())
+        return ("truthy", left)
+
+    def _operand(self) -> Tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise PredicateError(f"unexpected end of {self.expr!r}")
+        if token[1] == "[":
+            self.pos += 1
+            items: List[Any] = []
+            if not self._accept("]"):
+                items.append(self._literal(bare_words=True))
+                while self._accept(","):
+                    items.append(self._literal(bare_words=True))
+                self._expect("]")
+            return ("const", frozenset(items))
+        kind, value = token
+        if kind == "name" and value not in _KEYWORDS and value not in _CONSTANTS:
+            self.pos += 1
+            return ("field", tuple(value.split(".")))
+        return ("const", self._literal(bare_words=False))
+
+    def _literal(self, *, bare_words: bool) -> Any:
+        token = self._peek()
+        if token is None:
+            raise PredicateError(f"unexpected end of {self.expr!r}")
+        kind, value = token
+        self.pos += 1
+        if kind == "string":
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind == "number":
+            return float(value) if "." in value else int(value)
+        if kind == "name" and value in _CONSTANTS:
+            return _CONSTANTS[value]
+        if kind == "name" and bare_words and value not in _KEYWORDS:
+            return value
+        raise PredicateError(f"unexpected {value!r} in {self.expr!r}")
+
+
+def parse(expr: str) -> Tuple[Any, ...]:
+    """Parse ``expr`` and return its AST, raising :class:`PredicateError`."""
+    if not isinstance(expr, str):
+        raise PredicateError("predicate must be a string")
+    return _Parser(expr).parse()
+
+
+def _getter(node: Tuple[str, Any]) -> Callable[[Dict[str, Any]], Any]:
+    kind, value = node
+    if kind == "const":
+        return lambda event: value
+    if len(value) == 1:
+        key = value[0]
+        return lambda event: event.get(key)
+
+    def get_path(event: Dict[str, Any]) -> Any:
+        current: Any = event
+        for part in value:
+            if not isinstance(current, dict):
+                return None
+            current = current.get(part)
+        return current
+
+    return get_path
+
+
+def _comparison(node: Tuple[Any, ...]) -> Callable[[Dict[str, Any]], bool]:
+    if node[0] == "truthy":
+        get = _getter(node[1])
+        return lambda event: bool(get(event))
+    _, op, left, right = node
+    get_left = _getter(left)
+    if op in {"in", "not in"} and right[0] == "const":
+        members = right[1]
+        if op == "in":
+            return lambda event: _contains(members, get_left(event))
+        return lambda event: not _contains(members, get_left(event))
+    get_right = _getter(right)
+    if op == "in":
+        return lambda event: _contains(get_right(event), get_left(event))
+    if op == "not in":
+        return lambda event: not _contains(get_right(event), get_left(event))
+    compare = _COMPARATORS[op]
+
+    def cmp(event: Dict[str, Any]) -> bool:
+        try:
+            return bool(compare(get_left(event), get_right(event)))
+        except TypeError:
+            return False
+
+    return cmp
+
+
+def _contains(container: Any, item: Any) -> bool:
+    try:
+        return item in container
+    except TypeError:
+        return False
+
+
+class PredicateCompiler:
+    """Compile expressions into closures, sharing identical terms.
+
+    Each distinct comparison gets a slot; predicates compiled by the same
+    compiler cache term results in the ``memo`` dict passed to them, so a
+    term shared by many rules is evaluated once per event.
+    """
+
+    def __init__(self) -> None:
+        self._terms: Dict[Tuple[Any, ...], Predicate] = {}
+
+    @property
+    def term_count(self) -> int:
+        return len(self._terms)
+
+    def compile(self, expr: str) -> Predicate:
+        return self._build(parse(expr))
+
+    def _build(self, node: Tuple[Any, ...]) -> Predicate:
+        kind = node[0]
+        if kind == "and":
+            parts = tuple(self._build(n) for n in node[1])
+
+            def conjunction(event: Dict[str, Any], memo: Memo) -> bool:
+                for part in parts:
+                    if not part(event, memo):
+                        return False
+                return True
+
+            return conjunction
+        if kind == "or":
+            parts = tuple(self._build(n) for n in node[1])
+
+            def disjunction(event: Dict[str, Any], memo: Memo) -> bool:
+                for part in parts:
+                    if part(event, memo):
+                        return True
+                return False
+
+            return disjunction
+        if kind == "not":
+            inner = self._build(node[1])
+            return lambda event, memo: not inner(event, memo)
+        term = self._terms.get(node)
+        if term is None:
+            term = self._terms[node] = self._term(len(self._terms), node)
+        return term
+
+    @staticmethod
+    def _term(slot: int, node: Tuple[Any, ...]) -> Predicate:
+        evaluate = _comparison(node)
+
+        def term(event: Dict[str, Any], memo: Memo) -> bool:
+            result = memo.get(slot, _MISSING)
+            if result is _MISSING:
+                result = memo[slot] = evaluate(event)
+            return result  # type: ignore[return-value]
+
+        return term
@@ -0,0 +1,67 @@
+"""Process-wide retry budget to keep retries from amplifying an outage."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Tuple
+
+
+class RetryBudget:
+    """Permit retries only while they stay under a ratio of first attempts.
+
+    Counts are kept in one-second buckets over a sliding ``window``. A retry
+    is allowed while ``retries < ratio * first_attempts + min_retries`` over
+    that window; ``min_retries`` lets a quiet process still retry at all.
+    Share one instance between actions to make the budget process-wide.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        *,
+        window: float = 10.0,
+        min_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ratio = ratio
+        self.window = window
+        self.min_retries = min_retries
+        self._clock = clock
+        self._buckets: Deque[List[float]] = deque()
+        self._lock = threading.Lock()
+
+    def _bucket(self) -> List[float]:
+        now = int(self._clock())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def _totals(self) -> Tuple[float, float]:
+        attempts = sum(b[1] for b in self._buckets)
+        retries = sum(b[2] for b in self._buckets)
+        return attempts, retries
+
+    def record_attempt(self) -> None:
+        """Record a first attempt, which earns retry allowance."""
+        with self._lock:
+            self._bucket()[1] += 1
+
+    def try_retry(self) -> bool:
+        """Consume budget for one retry; return ``False`` when exhausted."""
+        from .metrics import retry_budget_retries_total, retry_budget_utilization
+
+        with self._lock:
+            bucket = self._bucket()
+            attempts, retries = self._totals()
+            allowance = self.ratio * attempts + self.min_retries
+            allowed = retries < allowance
+            if allowed:
+                bucket[2] += 1
+                retries += 1
+        retry_budget_utilization.set(retries / allowance if allowance else 1.0)
+        retry_budget_retries_total.labels(outcome="allowed" if allowed else "denied").inc()
+        return allowed
@@ -0,0 +1,205 @@
+"""Poll Airflow for triggered runs and report their final state.
+
+The trigger path only knows that a run was queued. :class:`RunStatePoller`
+tracks each queued run and the entities that triggered it. Every
+``interval`` seconds it asks Airflow for the runs of the tracked DAGs that
+finished since the last poll, with one paged batch query
+(``POST /api/v1/dags/~/dagRuns/list`` filtered by ``dag_ids``, terminal
+``states``, ``start_date_gte`` and ``end_date_gte``), and diffs the answer
+against the tracked set. A tracked run that finished is recorded on every
+tracked entity through the :class:`~.status_emitter.RunStatusEmitter` and
+then forgotten. A batched run is tracked once for all of its events.
+
+At most ``max_tracked`` runs are tracked. Runs queued beyond that keep their
+``queued`` status, as do runs that have not finished after ``max_age``
+seconds (e.g. because they were deleted), which are then dropped.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .status_emitter import RunStatusEmitter
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = frozenset({"success", "failed"})
+
+# Allowance for clock skew between this process and Airflow in date filters.
+CLOCK_SKEW = 300.0
+
+_Key = Tuple[str, str]
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class RunStatePoller:
+    """Feed terminal dagRun states into a run-status emitter."""
+
+    def __init__(
+        self,
+        airflow_url: str,
+        session: requests.Session,
+        emitter: RunStatusEmitter,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        interval: float = 30.0,
+        max_tracked: int = 10000,
+        max_age: float = 86400.0,
+        page_size: int = 100,
+        request_timeout: int = 10,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.airflow_url = airflow_url.rstrip("/")
+        self.session = session
+        self.emitter = emitter
+        self.headers = headers or {}
+        self.auth = auth
+        self.interval = interval
+        self.max_tracked = max_tracked
+        self.max_age = max_age
+        self.page_size = page_size
+        self.request_timeout = request_timeout
+        self._clock = clock
+        # (dag_id, dag_run_id) -> (time tracked, entity URNs)
+        self._runs: Dict[_Key, Tuple[float, Set[str]]] = {}
+        self._last_poll: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def tracked(self) -> int:
+        with self._lock:
+            return len(self._runs)
+
+    def track(self, entity_urn: str, dag_id: str, dag_run_id: str) -> bool:
+        """Poll ``dag_run_id`` until it finishes; return ``False`` if full."""
+        from .metrics import status_tracked_runs
+
+        key = (dag_id, dag_run_id)
+        with self._lock:
+            entry = self._runs.get(key)
+            if entry is None:
+                if len(self._runs) >= self.max_tracked:
+                    logger.warning(
+                        "tracking %s runs, not polling %s", len(self._runs), dag_run_id
+                    )
+                    return False
+                entry = self._runs[key] = (self._clock(), set())
+            entry[1].add(entity_urn)
+            status_tracked_runs.set(len(self._runs))
+        return True
+
+    def poll(self) -> int:
+        """Check every tracked run with one batch query; return how many finished."""
+        from .metrics import status_tracked_runs
+
+        now = self._clock()
+        with self._lock:
+            if not self._runs:
+                return 0
+            dag_ids = sorted({dag_id for dag_id, _ in self._runs})
+            oldest = min(tracked_at for tracked_at, _ in self._runs.values())
+        ended_after = oldest if self._last_poll is None else max(oldest, self._last_poll)
+        states = self._terminal_runs(dag_ids, oldest - CLOCK_SKEW, ended_after - CLOCK_SKEW)
+        if states is None:
+            return 0
+        self._last_poll = now
+
+        finished: List[Tuple[_Key, str, Set[str]]] = []
+        with self._lock:
+            for key, state in states.items():
+                entry = self._runs.pop(key, None)
+                if entry is not None:
+                    finished.append((key, state, entry[1]))
+            expired = [
+                key
+                for key, (tracked_at, _) in self._runs.items()
+                if now - tracked_at >= self.max_age
+            ]
+            for key in expired:
+                del self._runs[key]
+            status_tracked_runs.set(len(self._runs))
+        if expired:
+            logger.warning(
+                "%s runs not finished after %ss, no longer polling",
+                len(expired),
+                self.max_age,
+            )
+        for (dag_id, dag_run_id), state, urns in finished:
+            for urn in sorted(urns):
+                self.emitter.record(urn, dag_id, dag_run_id, state)
+        return len(finished)
+
+    def _terminal_runs(
+        self, dag_ids: List[str], started_after: float, ended_after: float
+    ) -> Optional[Dict[_Key, str]]:
+        """Return the state of each run of ``dag_ids`` that finished recently.
+
+        Returns ``None`` if Airflow could not be queried or polling stopped
+        before every page was read.
+        """
+        body: Dict[str, Any] = {
+            "dag_ids": dag_ids,
+            "states": sorted(TERMINAL_STATES),
+            "start_date_gte": _isoformat(started_after),
+            "end_date_gte": _isoformat(ended_after),
+            "page_limit": self.page_size,
+        }
+        states: Dict[_Key, str] = {}
+        offset = 0
+        try:
+            while True:
+                if self._stop.is_set():
+                    return None
+                resp = self.session.post(
+                    f"{self.airflow_url}/api/v1/dags/~/dagRuns/list",
+                    json={**body, "page_offset": offset},
+                    headers=self.headers,
+                    auth=self.auth,
+                    timeout=self.request_timeout,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+                page = data.get("dag_runs") or []
+                for run in page:
+                    if run.get("state") in TERMINAL_STATES:
+                        states[(run["dag_id"], run["dag_run_id"])] = run["state"]
+                offset += len(page)
+                if not page or offset >= data.get("total_entries", offset):
+                    break
+        except Exception as e:
+            logger.warning("error listing dag runs: %s", e)
+            return None
+        return states
+
+    def start(self) -> None:
+        """Poll every ``interval`` seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="run-state-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
@@ -0,0 +1,280 @@
+"""Batched write-back of triggered run status to DataHub GMS.
+
+The trigger path records the last run of each target DAG for the
+triggering entity with :meth:`RunStatusEmitter.record`, which only buffers
+it. A :class:`~.run_poller.RunStatePoller` records the run again once it
+finishes. A background thread sends buffered updates as one
+``ingestProposalBatch`` call per batch, when ``batch_size`` updates are
+pending or ``flush_interval`` seconds have passed. Each update is a ``PATCH``
+MCP that sets ``airflow.<dag_id>.*`` custom properties on the entity's
+properties aspect, so other custom properties and other DAGs' runs are left
+alone.
+
+Only the latest status per entity and DAG matters, so a pending update for
+the same pair is replaced rather than queued twice. When ``max_pending``
+updates are buffered (GMS down or slow), :meth:`record` blocks for up to
+``block_timeout`` seconds and then drops the update.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Properties aspect (with ``customProperties``) per entity type.
+PROPERTIES_ASPECTS = {
+    "dataset": "datasetProperties",
+    "dataJob": "dataJobInfo",
+    "dataFlow": "dataFlowInfo",
+    "container": "containerProperties",
+    "chart": "chartInfo",
+    "dashboard": "dashboardInfo",
+}
+
+
+class RunStatus(NamedTuple):
+    """Last run of one DAG triggered for an entity."""
+
+    entity_urn: str
+    dag_id: str
+    dag_run_id: str
+    state: str
+    timestamp: float
+
+
+def entity_type(urn: str) -> Optional[str]:
+    """Return the entity type of a ``urn:li:<type>:...`` URN."""
+    parts = urn.split(":", 3)
+    if len(parts) < 4 or parts[:2] != ["urn", "li"]:
+        return None
+    return parts[2]
+
+
+def to_mcp(status: RunStatus) -> Dict[str, Any]:
+    """Build the PATCH MCP that records ``status`` on its entity."""
+    kind = entity_type(status.entity_urn)
+    assert kind is not None
+    stamp = datetime.fromtimestamp(status.timestamp, timezone.utc).isoformat()
+    prefix = f"/customProperties/airflow.{status.dag_id}"
+    patch = [
+        {"op": "add", "path": f"{prefix}.{key}", "value": value}
+        for key, value in (
+            ("last_dag_run_id", status.dag_run_id),
+            ("last_run_state", status.state),
+            ("last_run_time", stamp),
+        )
+    ]
+    return {
+        "entityType": kind,
+        "entityUrn": status.entity_urn,
+        "changeType": "PATCH",
+        "aspectName": PROPERTIES_ASPECTS[kind],
+        "aspect": {
+            "contentType": "application/json-patch+json",
+            "value": json.dumps(patch),
+        },
+    }
+
+
+class RunStatusEmitter:
+    """Buffer run-status updates and send them to GMS in batches."""
+
+    def __init__(
+        self,
+        gms_url: str,
+        *,
+        token: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_pending: int = 10000,
+        block_timeout: Optional[float] = 1.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        request_timeout: int = 10,
+    ) -> None:
+        self.gms_url = gms_url.rstrip("/")
+        self.token = token
+        self._session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.request_timeout = request_timeout
+        self._pending: "OrderedDict[Tuple[str, str], RunStatus]" = OrderedDict()
+        self._cond = threading.Condition()
+        # Serializes take-and-send so updates for one entity and DAG stay in order.
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def record(
+        self,
+        entity_urn: str,
+        dag_id: str,
+        dag_run_id: str,
+        state: str,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """Buffer the status of ``dag_id``'s run for ``entity_urn``.
+
+        Returns ``False`` if the update was dropped.
+        """
+        from .metrics import status_pending, status_updates_total
+
+        kind = entity_type(entity_urn)
+        if kind not in PROPERTIES_ASPECTS:
+            logger.debug("no properties aspect for %s, skipping status", entity_urn)
+            status_updates_total.labels(outcome="skipped").inc()
+            return False
+        status = RunStatus(
+            entity_urn, dag_id, dag_run_id, state, time.time() if timestamp is None else timestamp
+        )
+        key = (entity_urn, dag_id)
+        with self._cond:
+            if self._closed:
+                status_updates_total.labels(outcome="dropped").inc()
+                return False
+            if key in self._pending:
+                self._pending[key] = status
+                status_updates_total.labels(outcome="coalesced").inc()
+                return True
+            deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+            while len(self._pending) >= self.max_pending and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("status buffer full, dropping update for %s", entity_urn)
+                    status_updates_total.labels(outcome="dropped").inc()
+                    return False
+                self._cond.wait(remaining)
+            self._pending[key] = status
+            status_pending.set(len(self._pending))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def _take(self) -> List[RunStatus]:
+        from .metrics import status_pending
+
+        with self._cond:
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popitem(last=False)[1])
+            status_pending.set(len(self._pending))
+            self._cond.notify_all()
+        return batch
+
+    def _send(self, batch: List[RunStatus]) -> bool:
+        """POST one batch of MCPs with retries; return whether GMS accepted it."""
+        import requests
+
+        from .metrics import status_flush_seconds, status_updates_total
+
+        headers = {
+            "Content-Type": "application/json",
+            "X-RestLi-Protocol-Version": "2.0.0",
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        body = {"proposals": [to_mcp(status) for status in batch]}
+        start = time.perf_counter()
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    resp = self.session.post(
+                        f"{self.gms_url}/aspects?action=ingestProposalBatch",
+                        json=body,
+                        headers=headers,
+                        timeout=self.request_timeout,
+                    )
+                    error = f"status {resp.status_code}"
+                    if resp.status_code < 400:
+                        status_updates_total.labels(outcome="sent").inc(len(batch))
+                        return True
+                    if resp.status_code < 500 and resp.status_code != 429:
+                        break
+                except requests.RequestException as e:
+                    error = str(e)
+                logger.warning(
+                    "error sending %s run statuses to GMS (%s), attempt %s",
+                    len(batch),
+                    error,
+                    attempt,
+                )
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+            logger.error("dropping %s run statuses: %s", len(batch), error)
+            status_updates_total.labels(outcome="failed").inc(len(batch))
+            return False
+        finally:
+            status_flush_seconds.observe(time.perf_counter() - start)
+
+    def flush(self) -> None:
+        """Send every pending update now, from the calling thread."""
+        while True:
+            with self._send_lock:
+                batch = self._take()
+                if not batch:
+                    return
+                self._send(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed and not self._pending:
+                    return
+            with self._send_lock:
+                batch = self._take()
+                if batch:
+                    self._send(batch)
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="run-status-emitter", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting updates and send what is still buffered."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            self.flush()
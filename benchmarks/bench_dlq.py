@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""DLQ query time: full JSONL scan vs. the offset index.
+
+Generates a DLQ of ``--size-mb`` megabytes, then answers "entries for one DAG
+that failed with 5xx since a timestamp" by scanning and parsing every line,
+and through ``DeadLetterQueue`` (cold: loading the sidecar; warm: in memory),
+reading the matches by offset through ``mmap``.
+
+    python benchmarks/bench_dlq.py --size-mb 2048
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger.dlq import DeadLetterQueue  # noqa: E402
+
+ERROR_CLASSES = ["5xx", "4xx", "timeout", "connection", "ValueError"]
+
+
+def generate(path: str, size_mb: int, dags: int, seed: int) -> int:
+    rng = random.Random(seed)
+    padding = "x" * 1500
+    target = size_mb * 1024 * 1024
+    written = count = 0
+    start_ts = 1_700_000_000.0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            lines = []
+            for _ in range(1000):
+                count += 1
+                dag_id = f"dag_{rng.randrange(dags)}"
+                lines.append(json.dumps({
+                    "timestamp": start_ts + count,
+                    "event": {"type": "sample_event", "n": count, "payload": padding},
+                    "dag_id": dag_id,
+                    "dag_run_id": f"{dag_id}-{count:08x}",
+                    "error": "boom",
+                    "error_class": rng.choice(ERROR_CLASSES),
+                }))
+            chunk = "\n".join(lines) + "\n"
+            f.write(chunk)
+            written += len(chunk)
+    return count
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--dags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--dir", default=None, help="directory for the DLQ files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "dlq.jsonl")
+        elapsed, count = timed(lambda: generate(path, args.size_mb, args.dags, args.seed))
+        print(f"generated {count} entries, {os.path.getsize(path) / 2**20:.0f} MiB "
+              f"in {elapsed:.1f}s")
+        since = 1_700_000_000.0 + count / 2
+        filters = {"dag_id": "dag_7", "error_class": "5xx", "since": since}
+
+        def scan():
+            matches = []
+            with open(path, "rb") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if (entry["dag_id"] == filters["dag_id"]
+                            and entry["error_class"] == filters["error_class"]
+                            and entry["timestamp"] >= since):
+                        matches.append(entry)
+            return matches
+
+        elapsed, build = timed(lambda: DeadLetterQueue(path).count())
+        print(f"  one-off index build for unindexed DLQ   {elapsed:8.2f} s")
+
+        elapsed, expected = timed(scan)
+        print(f"  full scan + json.loads                   {elapsed:8.2f} s  "
+              f"({len(expected)} matches)")
+
+        def indexed(dlq):
+            return list(dlq.read(dlq.query(**filters)))
+
+        dlq = DeadLetterQueue(path)
+        elapsed, matches = timed(lambda: indexed(dlq))
+        print(f"  index query, cold (load sidecar) + mmap  {elapsed:8.2f} s  "
+              f"({len(matches)} matches)")
+        elapsed, matches = timed(lambda: indexed(dlq))
+        print(f"  index query, warm + mmap                 {elapsed * 1000:8.2f} ms")
+        assert [e["dag_run_id"] for e in matches] == [e["dag_run_id"] for e in expected]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tail latency of dagRun POSTs with and without hedging.
+
+Starts the local Airflow API stub (``scripts/airflow_stub.py``) with a
+fraction of POSTs stalling, then triggers the same number of events with
+hedging off and on and reports latency percentiles and the share of requests
+that were hedged.
+
+    python benchmarks/bench_hedging.py --events 500 --stall-rate 0.03
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger import AirflowTriggerAction  # noqa: E402
+from scripts.airflow_stub import AirflowStub, StubConfig  # noqa: E402
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def run(url, mappings, events, offset, **kwargs):
+    action = AirflowTriggerAction(url, mappings, **kwargs)
+    latencies = []
+    for i in range(events):
+        start = time.perf_counter()
+        action.trigger({"type": "bench_event", "id": offset + i})
+        latencies.append((time.perf_counter() - start) * 1000)
+    action.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--base-ms", type=float, default=5.0)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-ms", type=float, default=500.0)
+    parser.add_argument("--percentile", type=float, default=0.95)
+    parser.add_argument("--budget", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    stub = AirflowStub(
+        StubConfig(
+            latency=f"uniform:{args.base_ms * 0.5},{args.base_ms * 1.5}",
+            stall_rate=args.stall_rate,
+            stall_ms=args.stall_ms,
+            seed=args.seed,
+        )
+    ).start()
+    url = stub.url
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        f.write("bench_event:\n  dag_id: bench_dag\n")
+    try:
+        for label, kwargs, offset in [
+            ("no hedging", {}, 0),
+            (
+                f"hedged p{args.percentile * 100:g}",
+                {"hedge_percentile": args.percentile, "hedge_budget": args.budget},
+                args.events,
+            ),
+        ]:
+            latencies = run(url, f.name, args.events, offset, **kwargs)
+            summary = "  ".join(
+                f"p{q * 100:g}={percentile(latencies, q):7.1f}ms"
+                for q in (0.5, 0.95, 0.99)
+            )
+            print(f"{label:<14} {summary}")
+        from actions.airflow_trigger.metrics import hedged_requests_total
+
+        hedges = sum(
+            hedged_requests_total.labels(winner=w)._value.get()
+            for w in ("primary", "hedge", "none")
+        )
+        print(f"hedged {hedges:.0f} of {args.events} requests "
+              f"({hedges / args.events:.1%}, budget {args.budget:.0%})")
+    finally:
+        pathlib.Path(f.name).unlink()
+        pathlib.Path(f.name + ".cache.json").unlink(missing_ok=True)
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Bytes per in-flight event, measured with tracemalloc.
+
+Builds the per-event state that ``_trigger_target`` keeps alive while a POST
+is outstanding (request, headers, result) for ``--inflight`` events at once,
+and compares it with the previous dict-based representation: a deep-copied
+conf, a headers dict built from scratch, a log ``extra`` dict, a per-event URL
+string and a non-slotted result. Events themselves are allocated before
+tracing starts, since they are held by the caller either way.
+
+    python benchmarks/bench_inflight_memory.py --inflight 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import sys
+import tempfile
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger import AirflowTriggerAction, TriggerResult  # noqa: E402
+
+MAPPINGS = """\
+dataset_changed:
+  targets:
+    - dag_id: ingest_dataset
+      conf:
+        dataset: '{{ entityUrn }}'
+        aspect: '{{ aspectName }}'
+        source: datahub
+        options:
+          checks: [row_count, freshness, schema, null_ratio]
+          thresholds: {row_count: 1000, freshness_hours: 24, null_ratio: 0.05}
+          notify: {channel: data-quality, on: [failure, warning]}
+"""
+
+URN = "urn:li:dataset:(urn:li:dataPlatform:hive,warehouse.orders_{},PROD)"
+
+
+@dataclass
+class LegacyResult:
+    dag_id: str
+    dag_run_id: Optional[str]
+    error: Optional[Exception] = None
+
+
+def legacy_state(
+    action: AirflowTriggerAction, event: Dict[str, Any], target: Dict[str, Any], cid: str
+) -> List[Any]:
+    """Per-event state as ``_trigger_target`` built it before record types."""
+
+    def resolve(value: Any) -> Any:
+        if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
+            return event.get(value.strip("{} "))
+        if isinstance(value, dict):
+            return {k: resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [resolve(v) for v in value]
+        return value
+
+    dag_id = target["dag_id"]
+    dag_run_id = action.dag_run_id(dag_id, event)
+    extra = {"correlation_id": cid, "dag_id": dag_id, "dag_run_id": dag_run_id}
+    conf = {k: resolve(v) for k, v in target["conf"].items()}
+    conf["correlation_id"] = cid
+    headers, auth = action._auth()
+    headers.update({"Content-Type": "application/json", "X-Correlation-ID": cid})
+    url = f"{action.airflow_url}/api/v1/dags/{dag_id}/dagRuns"
+    payload = {"dag_run_id": dag_run_id, "conf": conf}
+    return [LegacyResult(dag_id, dag_run_id), extra, headers, auth, url, payload]
+
+
+def current_state(
+    action: AirflowTriggerAction, event: Dict[str, Any], target: Dict[str, Any], cid: str
+) -> List[Any]:
+    """Per-event state as ``_trigger_target`` builds it now."""
+    request = action._build_request([event], target, cid)
+    headers = {**action._headers, "X-Correlation-ID": cid}
+    return [TriggerResult(request.dag_id, request.dag_run_id), request, headers]
+
+
+def measure(build: Callable[[Dict[str, Any], str], List[Any]], events, cids) -> int:
+    """Return bytes still allocated while every event's state is alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    inflight = [build(event, cid) for event, cid in zip(events, cids)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del inflight
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inflight", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "mappings.yaml"
+        path.write_text(MAPPINGS)
+        action = AirflowTriggerAction("http://airflow:8080", str(path), token="t" * 40)
+    (target,) = action.mappings["dataset_changed"]["targets"]
+    events = [
+        {
+            "type": "dataset_changed",
+            "entityUrn": URN.format(i),
+            "aspectName": "schemaMetadata",
+            "seq": i,
+        }
+        for i in range(args.inflight)
+    ]
+    cids = [str(uuid.uuid4()) for _ in events]
+
+    print(f"{args.inflight} events in flight")
+    for label, build in [
+        ("dicts (before)", lambda e, c: legacy_state(action, e, target, c)),
+        ("records (now)", lambda e, c: current_state(action, e, target, c)),
+    ]:
+        total = measure(build, events, cids)
+        print(f"  {label:<16} {total / 2**20:8.2f} MiB  {total / args.inflight:8.0f} B/event")
+    action.close()
+
+
+if __name__ == "__main__":
+    main()
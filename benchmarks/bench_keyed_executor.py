@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Throughput of the keyed executor in ``threads`` and ``shards`` modes.
+
+Dispatches synthetic events across lanes with a CPU-bound handler (JSON
+encoding plus SHA-256, like ``dag_run_id`` generation) and reports events per
+second for a single lane, thread lanes and process shards.
+
+    python benchmarks/bench_keyed_executor.py --events 4000 --lanes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger.keyed_executor import KeyedExecutor  # noqa: E402
+
+
+def cpu_handler_factory():
+    def handle(event):
+        digest = b""
+        for _ in range(200):
+            payload = json.dumps(event, sort_keys=True).encode("utf-8") + digest
+            digest = hashlib.sha256(payload).digest()
+        return digest.hex()[:8]
+
+    return handle
+
+
+def run(events, **kwargs) -> float:
+    executor = KeyedExecutor(cpu_handler_factory, queue_size=len(events), **kwargs)
+    # Warm up shards so process start-up is not measured.
+    for lane_event in [{"entityUrn": f"warm:{i}"} for i in range(kwargs["lanes"] * 4)]:
+        executor.submit(lane_event).result()
+    start = time.perf_counter()
+    futures = [executor.submit(event) for event in events]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    return len(events) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=4000)
+    parser.add_argument("--lanes", type=int, default=4)
+    parser.add_argument("--urns", type=int, default=200)
+    args = parser.parse_args()
+
+    events = [
+        {
+            "type": "MetadataChangeLogEvent_v1",
+            "entityUrn": f"urn:li:dataset:(urn:li:dataPlatform:hive,t{i % args.urns},PROD)",
+            "seq": i,
+        }
+        for i in range(args.events)
+    ]
+    for label, kwargs in [
+        ("1 lane (threads)", {"lanes": 1}),
+        (f"{args.lanes} lanes (threads)", {"lanes": args.lanes}),
+        (f"{args.lanes} lanes (shards)", {"lanes": args.lanes, "mode": "shards"}),
+    ]:
+        print(f"{label:<22} {run(events, **kwargs):10.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Per-event logging overhead on the trigger path.
+
+Emits the log calls a trigger makes (one ``info`` per event and a retry
+``warning`` for a share of events) to a slow stream, and reports the time
+spent in the calling thread per event for synchronous logging, the queue
+handler, and the queue handler with rate-limited warnings.
+
+    python benchmarks/bench_logging.py --events 20000 --write-us 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger.logging_setup import (  # noqa: E402
+    JsonFormatter,
+    RateLimitFilter,
+    configure_logging,
+)
+
+
+class SlowStream:
+    """A stream whose writes block for ``write_us`` microseconds, like a busy pipe."""
+
+    def __init__(self, write_us: float) -> None:
+        self.write_s = write_us / 1e6
+        self.lines = 0
+
+    def write(self, data: str) -> None:
+        time.sleep(self.write_s)
+        self.lines += data.count("\n")
+
+    def flush(self) -> None:
+        pass
+
+
+def emit(logger: logging.Logger, events: int, warn_every: int) -> float:
+    start = time.perf_counter()
+    for i in range(events):
+        extra = {"correlation_id": f"c{i}", "dag_id": f"dag_{i % 10}", "dag_run_id": f"r{i}"}
+        if i % warn_every == 0:
+            logger.warning("error triggering %s (status %s), attempt %s",
+                           extra["dag_id"], 503, 1, extra=extra)
+        logger.info("triggered dag", extra=extra)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--write-us", type=float, default=50.0)
+    parser.add_argument("--warn-every", type=int, default=2)
+    args = parser.parse_args()
+
+    def sync_logger(name):
+        stream = SlowStream(args.write_us)
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        return logger, stream, None
+
+    def queued_logger(name, rate_limit=None):
+        stream = SlowStream(args.write_us)
+        listener = configure_logging(
+            stream=stream, logger_name=name, queue_size=args.events * 2,
+            rate_limit=rate_limit,
+        )
+        return logging.getLogger(name), stream, listener
+
+    for label, (logger, stream, listener) in [
+        ("synchronous", sync_logger("bench.sync")),
+        ("queue handler", queued_logger("bench.queue")),
+        ("queue + rate limit", queued_logger("bench.limited", RateLimitFilter(burst=5))),
+    ]:
+        elapsed = emit(logger, args.events, args.warn_every)
+        if listener is not None:
+            listener.stop()
+        print(f"{label:<20} {elapsed / args.events * 1e6:8.1f} us/event "
+              f"in caller, {stream.lines} lines written")
+
+
+if __name__ == "__main__":
+    main()
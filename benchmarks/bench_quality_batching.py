@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""One DAG run per dataset vs. batched runs with dynamic task mapping.
+
+Action side (always): triggers ``--datasets`` events against the local
+Airflow stub, once with a per-event mapping and once with a ``batch`` rule,
+and reports dagRuns created and wall time.
+
+Airflow side (when ``airflow`` is importable and its metadata DB is
+initialized, e.g. ``airflow db migrate``): parse time of the previous
+single-dataset DAG vs. the mapped ``example_quality_check``, and ``dag.test()``
+time for one run per dataset vs. one mapped run per batch.
+
+    python benchmarks/bench_quality_batching.py --datasets 500 --batch-size 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import pathlib
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from actions.airflow_trigger import AirflowTriggerAction  # noqa: E402
+from scripts.airflow_stub import AirflowStub, StubConfig  # noqa: E402
+
+DAG_FILE = ROOT / "deploy" / "airflow" / "dags" / "example_quality_check.py"
+
+# example_quality_check before dynamic task mapping, for comparison.
+SINGLE_DAG = '''
+from datetime import datetime
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+
+
+def quality_check(**context):
+    conf = context.get("dag_run").conf or {}
+    print(f"Running quality check for {conf.get('dataset')}")
+
+
+with DAG(
+    dag_id="example_quality_check_single",
+    start_date=datetime(2024, 1, 1),
+    schedule=None,
+    catchup=False,
+) as dag:
+    PythonOperator(task_id="run_quality_check", python_callable=quality_check)
+'''
+
+URN = "urn:li:dataset:(urn:li:dataPlatform:hive,db.table_{},PROD)"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_action(args, tmp: pathlib.Path) -> None:
+    single = tmp / "single.yaml"
+    single.write_text(
+        "dataset_tagged:\n  dag_id: example_quality_check\n"
+        "  conf:\n    dataset: '{{ entityUrn }}'\n"
+    )
+    batched = tmp / "batched.yaml"
+    batched.write_text(
+        single.read_text()
+        + f"  batch:\n    field: dataset\n    into: datasets\n"
+        f"    max_size: {args.batch_size}\n    max_wait: 60\n"
+    )
+    events = [{"type": "dataset_tagged", "entityUrn": URN.format(i)} for i in range(args.datasets)]
+    print(f"action: {args.datasets} events, stub latency {args.latency}")
+    for label, mappings in [("run per dataset", single), ("batched", batched)]:
+        with AirflowStub(StubConfig(latency=args.latency)) as stub:
+            action = AirflowTriggerAction(stub.url, str(mappings), backoff_factor=0)
+
+            def run():
+                for event in events:
+                    action.trigger(event)
+                action.close()
+
+            elapsed, _ = timed(run)
+            print(f"  {label:<16} {stub.run_count:5d} dagRuns  {stub.posts:5d} POSTs  "
+                  f"{elapsed * 1000:8.1f} ms")
+
+
+def bench_airflow(args, tmp: pathlib.Path) -> None:
+    try:
+        from airflow.models.dagbag import DagBag
+    except ImportError:
+        print("airflow: not installed, skipping parse and run benchmarks")
+        return
+    logging.getLogger("airflow").setLevel(logging.ERROR)
+    single_file = tmp / "example_quality_check_single.py"
+    single_file.write_text(SINGLE_DAG)
+
+    print(f"airflow: parse time over {args.parse_repeats} parses")
+    bags = {}
+    for label, path in [("single", single_file), ("mapped", DAG_FILE)]:
+        elapsed, _ = timed(
+            lambda path=path: [
+                DagBag(dag_folder=str(path), include_examples=False)
+                for _ in range(args.parse_repeats)
+            ]
+        )
+        bags[label] = DagBag(dag_folder=str(path), include_examples=False)
+        print(f"  {label:<16} {elapsed / args.parse_repeats * 1000:8.1f} ms/parse")
+
+    single_dag = bags["single"].get_dag("example_quality_check_single")
+    mapped_dag = bags["mapped"].get_dag("example_quality_check")
+    datasets = [URN.format(i) for i in range(args.datasets)]
+    batches = [
+        datasets[i : i + args.batch_size] for i in range(0, len(datasets), args.batch_size)
+    ]
+    print(f"airflow: dag.test() for {args.datasets} datasets")
+    elapsed, _ = timed(lambda: [single_dag.test(run_conf={"dataset": d}) for d in datasets])
+    print(f"  {'run per dataset':<16} {len(datasets):5d} runs  {elapsed:8.2f} s")
+    elapsed, _ = timed(lambda: [mapped_dag.test(run_conf={"datasets": b}) for b in batches])
+    print(f"  {'mapped batches':<16} {len(batches):5d} runs  {elapsed:8.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datasets", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency", default="fixed:5", help="stub latency spec")
+    parser.add_argument("--parse-repeats", type=int, default=20)
+    parser.add_argument("--skip-airflow", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_action(args, pathlib.Path(tmp))
+        if not args.skip_airflow:
+            bench_airflow(args, pathlib.Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark: import time and mappings load time.
+
+Runs ``python -X importtime`` against the action package and times loading a
+synthetic multi-thousand-rule mappings file with and without the compiled
+cache.
+
+    python benchmarks/bench_startup.py --rules 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def import_time_us(module: str) -> int:
+    """Return the cumulative import time of ``module`` in microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def write_rules(path: str, rules: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rules):
+            f.write(
+                f"event_{i}:\n"
+                f"  dag_id: dag_{i % 50}\n"
+                "  conf:\n"
+                "    dataset: '{{entityUrn}}'\n"
+                "    nested:\n"
+                f"      priority: {i % 5}\n"
+                "      tags: [a, b, c]\n"
+            )
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in ("actions.airflow_trigger", "requests", "yaml", "prometheus_client"):
+        print(f"import {module:<28} {import_time_us(module) / 1000:8.1f} ms")
+
+    import yaml
+
+    from actions.airflow_trigger.mappings import load_mappings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mappings.yaml")
+        write_rules(path, args.rules)
+
+        def pure_python():
+            with open(path, encoding="utf-8") as f:
+                yaml.load(f, Loader=yaml.SafeLoader)
+
+        cache = path + ".cache.json"
+
+        def cold():
+            if os.path.exists(cache):
+                os.unlink(cache)
+            load_mappings(path)
+
+        print(f"{args.rules} rules, best of {args.repeat}:")
+        print(f"  yaml.safe_load (pure Python)   {best_of(pure_python, args.repeat) * 1000:8.1f} ms")
+        print(f"  load_mappings, cache miss      {best_of(cold, args.repeat) * 1000:8.1f} ms")
+        load_mappings(path)
+        warm = best_of(lambda: load_mappings(path), args.repeat)
+        print(f"  load_mappings, cache hit       {warm * 1000:8.1f} ms")
+        os.unlink(path)
+        only = best_of(lambda: load_mappings(path, cache), args.repeat)
+        print(f"  load_mappings, cache only      {only * 1000:8.1f} ms")
+        print(f"  libyaml available: {hasattr(yaml, 'CSafeLoader')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
-from airflow import DAG
-from airflow.operators.python import PythonOperator
 
+from airflow.decorators import dag, task
 
-def quality_check(**context):
-    conf = context.get("dag_run").conf or {}
-    dataset = conf.get("dataset")
-    print(f"Running quality check for {dataset}")
+# Upper bound on quality checks running at once across all runs of this DAG.
+MAX_PARALLEL_CHECKS = int(os.getenv("QUALITY_CHECK_MAX_PARALLEL", "16"))
 
 
-with DAG(
+@dag(
     dag_id="example_quality_check",
     description="Simulated data quality run",
     start_date=datetime(2024, 1, 1),
     schedule=None,
     catchup=False,
     tags=["example"],
-) as dag:
-    PythonOperator(task_id="run_quality_check", python_callable=quality_check)
+)
+def example_quality_check():
+    @task
+    def list_datasets(**context) -> list[str]:
+        """Read ``datasets`` (batched trigger) or ``dataset`` from the run conf."""
+        conf = context["dag_run"].conf or {}
+        if conf.get("datasets") is not None:
+            return list(conf["datasets"])
+        return [conf["dataset"]] if conf.get("dataset") else []
+
+    @task(max_active_tis_per_dag=MAX_PARALLEL_CHECKS)
+    def run_quality_check(dataset: str) -> None:
+        print(f"Running quality check for {dataset}")
+
+    run_quality_check.expand(dataset=list_datasets())
+
+
+example_quality_check()
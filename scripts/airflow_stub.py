@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Local stub of the Airflow REST API for load and fault-injection tests.
+
+Implements the endpoints the trigger action uses: ``GET /health``,
+``GET/POST /api/v1/dags/{dag_id}/dagRuns``,
+``GET /api/v1/dags/{dag_id}/dagRuns/{dag_run_id}``,
+``POST /api/v1/dags/~/dagRuns/list``, ``GET /api/v1/dags`` and
+``PATCH /api/v1/dags/{dag_id}``. Created runs move through
+``run_progression`` (by default queued, running, then success). Supports bearer or basic auth, configurable
+latency, injected 5xx errors, 429 throttling and stalls, 409 on duplicate
+``dag_run_id``, seeded DAGs, and outages, either toggled at runtime or
+scheduled. ``--seed`` makes the injected faults reproducible.
+
+    python scripts/airflow_stub.py --port 8080 --latency lognormal:20,0.5 --error-rate 0.05
+    python scripts/airflow_stub.py --stall-rate 0.01 --outage 30:10 --dag d1 --seed 7
+"""
+
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_DAG_RUNS = re.compile(r"^/api/v1/dags/([^/]+)/dagRuns$")
+_DAG_RUN = re.compile(r"^/api/v1/dags/([^/]+)/dagRuns/([^/]+)$")
+_DAG_RUNS_LIST = "/api/v1/dags/~/dagRuns/list"
+_DAG = re.compile(r"^/api/v1/dags/([^/]+)$")
+
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Return a sampler of latencies in milliseconds from ``spec``.
+
+    ``fixed:MS``, ``uniform:LOW,HIGH``, ``exp:MEAN`` or
+    ``lognormal:MEDIAN,SIGMA``.
+    """
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",") if p]
+    if kind == "fixed" and len(params) == 1:
+        return lambda: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda: rng.uniform(params[0], params[1])
+    if kind == "exp" and len(params) == 1:
+        return lambda: rng.expovariate(1 / params[0]) if params[0] else 0.0
+    if kind == "lognormal" and len(params) == 2:
+        mu = math.log(params[0])
+        return lambda: rng.lognormvariate(mu, params[1])
+    raise ValueError(f"invalid latency spec {spec!r}")
+
+
+def parse_progression(spec: str) -> List[Tuple[str, float]]:
+    """Parse ``STATE:SECONDS,...,STATE`` into ``(state, seconds)`` steps.
+
+    The last state has no duration; runs stay in it.
+    """
+    steps: List[Tuple[str, float]] = []
+    for part in spec.split(","):
+        state, _, seconds = part.partition(":")
+        steps.append((state.strip(), float(seconds) if seconds else math.inf))
+    if not steps[0][0] or any(math.isinf(d) for _, d in steps[:-1]):
+        raise ValueError(f"invalid run progression {spec!r}")
+    return steps
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def parse_outage(value: str) -> Tuple[float, float]:
+    """Parse ``START:SECONDS`` into an outage window."""
+    start, _, duration = value.partition(":")
+    return float(start), float(duration)
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub; fields may be changed while it runs."""
+
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 1000.0
+    token: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    dags: List[Dict[str, Any]] = field(default_factory=list)
+    # Run states and how long each lasts, see ``parse_progression``.
+    run_progression: str = "queued:1,running:1,success"
+    # (start, duration) in seconds since the stub started.
+    outages: List[Tuple[float, float]] = field(default_factory=list)
+    seed: Optional[int] = None
+
+
+class AirflowStub:
+    """In-process Airflow API stub serving on a background thread."""
+
+    def __init__(self, config: Optional[StubConfig] = None, port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self.rng = random.Random(self.config.seed)
+        self._sample_latency = latency_sampler(self.config.latency, self.rng)
+        self.lock = threading.Lock()
+        self.runs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.stats: Counter = Counter()
+        self.outage = False
+        self.started = time.monotonic()
+        self._progression: Tuple[str, List[Tuple[str, float]]] = ("", [])
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "AirflowStub":
+        self.started = time.monotonic()
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="airflow-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "AirflowStub":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def set_latency(self, spec: str) -> None:
+        self.config.latency = spec
+        self._sample_latency = latency_sampler(spec, self.rng)
+
+    def in_outage(self) -> bool:
+        if self.outage:
+            return True
+        elapsed = time.monotonic() - self.started
+        return any(start <= elapsed < start + length for start, length in self.config.outages)
+
+    def run_view(self, run: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        """Return ``run`` as the API shows it, with its state at ``now``."""
+        now = time.time() if now is None else now
+        view = {k: v for k, v in run.items() if k != "created"}
+        elapsed = now - run["created"]
+        spec = self.config.run_progression
+        if self._progression[0] != spec:
+            self._progression = (spec, parse_progression(spec))
+        steps = self._progression[1]
+        offset = 0.0
+        for state, duration in steps:
+            view["state"] = state
+            if state == "running":
+                view["start_date"] = _isoformat(run["created"] + offset)
+            if elapsed < offset + duration:
+                break
+            offset += duration
+        if view["state"] in ("success", "failed"):
+            view.setdefault("start_date", _isoformat(run["created"] + offset))
+            view["end_date"] = _isoformat(run["created"] + offset)
+        return view
+
+    def list_runs(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a ``dagRuns/list`` batch query (dag_ids, states, start_date_gte)."""
+        now = time.time()
+        dag_ids = query.get("dag_ids")
+        states = query.get("states")
+        start_gte = query.get("start_date_gte")
+        with self.lock:
+            runs = [
+                run
+                for dag_id, dag_runs in self.runs.items()
+                if dag_ids is None or dag_id in dag_ids
+                for run in dag_runs.values()
+            ]
+        views = []
+        for run in runs:
+            view = self.run_view(run, now)
+            if states is not None and view["state"] not in states:
+                continue
+            if start_gte is not None and (
+                "start_date" not in view
+                or _parse_time(view["start_date"]) < _parse_time(start_gte)
+            ):
+                continue
+            views.append(view)
+        offset = int(query.get("page_offset", 0))
+        limit = int(query.get("page_limit", 100))
+        return {"dag_runs": views[offset : offset + limit], "total_entries": len(views)}
+
+    @property
+    def posts(self) -> int:
+        return self.stats["POST dagRuns"]
+
+    @property
+    def run_count(self) -> int:
+        with self.lock:
+            return sum(len(runs) for runs in self.runs.values())
+
+    def _authorized(self, header: Optional[str]) -> Optional[int]:
+        """Return an error status for the Authorization header, or ``None``."""
+        config = self.config
+        if not config.token and not config.username:
+            return None
+        if not header:
+            return 401
+        if config.token and header == f"Bearer {config.token}":
+            return None
+        if config.username and header.startswith("Basic "):
+            expected = f"{config.username}:{config.password or ''}".encode()
+            if base64.b64decode(header[6:]) == expected:
+                return None
+        return 403
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+                with stub.lock:
+                    stub.stats[f"status {status}"] += 1
+
+            def _body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length)) if length else {}
+
+            def _guard(self) -> bool:
+                """Apply outage and auth checks; return ``False`` if replied."""
+                if stub.in_outage():
+                    self._reply(503, {"title": "Service Unavailable"})
+                    return False
+                status = stub._authorized(self.headers.get("Authorization"))
+                if status is not None:
+                    self._reply(status, {"title": "Unauthorized" if status == 401 else "Forbidden"})
+                    return False
+                return True
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                if parsed.path == "/health":
+                    state = "unhealthy" if stub.in_outage() else "healthy"
+                    self._reply(
+                        200,
+                        {"metadatabase": {"status": state}, "scheduler": {"status": state}},
+                    )
+                    return
+                if not self._guard():
+                    return
+                match = _DAG_RUNS.match(parsed.path)
+                if match:
+                    with stub.lock:
+                        runs = list(stub.runs.get(match.group(1), {}).values())
+                    views = [stub.run_view(run) for run in runs]
+                    self._reply(200, {"dag_runs": views, "total_entries": len(views)})
+                    return
+                match = _DAG_RUN.match(parsed.path)
+                if match:
+                    with stub.lock:
+                        run = stub.runs.get(match.group(1), {}).get(match.group(2))
+                    if run is None:
+                        self._reply(404, {"title": "DAGRun not found"})
+                    else:
+                        self._reply(200, stub.run_view(run))
+                    return
+                if parsed.path == "/api/v1/dags":
+                    query = parse_qs(parsed.query)
+                    offset = int(query.get("offset", ["0"])[0])
+                    limit = int(query.get("limit", ["100"])[0])
+                    dags = stub.config.dags
+                    self._reply(
+                        200,
+                        {"dags": dags[offset : offset + limit], "total_entries": len(dags)},
+                    )
+                    return
+                self._reply(404, {"title": "Not Found"})
+
+            def do_PATCH(self) -> None:
+                if not self._guard():
+                    return
+                match = _DAG.match(urlparse(self.path).path)
+                body = self._body()
+                for dag in stub.config.dags if match else []:
+                    if dag["dag_id"] == match.group(1):
+                        dag.update({k: v for k, v in body.items() if k == "is_paused"})
+                        self._reply(200, dag)
+                        return
+                self._reply(404, {"title": "DAG not found"})
+
+            def do_POST(self) -> None:
+                path = urlparse(self.path).path
+                if path == _DAG_RUNS_LIST:
+                    with stub.lock:
+                        stub.stats["POST dagRuns/list"] += 1
+                    body = self._body()
+                    if self._guard():
+                        self._reply(200, stub.list_runs(body))
+                    return
+                match = _DAG_RUNS.match(path)
+                if not match:
+                    self._reply(404, {"title": "Not Found"})
+                    return
+                with stub.lock:
+                    stub.stats["POST dagRuns"] += 1
+                    roll = stub.rng.random()
+                    stall = stub.rng.random() < stub.config.stall_rate
+                    delay = stub.config.stall_ms if stall else stub._sample_latency()
+                body = self._body()
+                time.sleep(max(delay, 0.0) / 1000)
+                if not self._guard():
+                    return
+                config = stub.config
+                if roll < config.throttle_rate:
+                    self._reply(429, {"title": "Too Many Requests"}, {"Retry-After": "1"})
+                    return
+                if roll < config.throttle_rate + config.error_rate:
+                    self._reply(500, {"title": "Internal Server Error"})
+                    return
+                dag_id = match.group(1)
+                dag_run_id = body.get("dag_run_id") or f"manual__{time.time()}"
+                run = {
+                    "dag_id": dag_id,
+                    "dag_run_id": dag_run_id,
+                    "conf": body.get("conf") or {},
+                    "created": time.time(),
+                }
+                with stub.lock:
+                    runs = stub.runs.setdefault(dag_id, {})
+                    duplicate = dag_run_id in runs
+                    if not duplicate:
+                        runs[dag_run_id] = run
+                if duplicate:
+                    self._reply(409, {"title": "Conflict", "detail": f"DAGRun {dag_run_id} exists"})
+                else:
+                    self._reply(200, stub.run_view(run))
+
+        return Handler
+
+
+def _progression(spec: str) -> str:
+    parse_progression(spec)
+    return spec
+
+
+def parse_args(argv: Optional[List[str]] = None) -> Tuple[StubConfig, int]:
+    """Return the stub configuration and port from command-line arguments."""
+    parser = argparse.ArgumentParser(description="Run a local Airflow API stub")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=1000.0)
+    parser.add_argument(
+        "--outage", type=parse_outage, action="append", default=[], metavar="START:SECONDS"
+    )
+    parser.add_argument("--token")
+    parser.add_argument("--username", help="require basic auth")
+    parser.add_argument("--password")
+    parser.add_argument(
+        "--dag", action="append", default=[], metavar="DAG_ID", help="seed an active DAG"
+    )
+    parser.add_argument(
+        "--run-progression",
+        type=_progression,
+        default=StubConfig.run_progression,
+        metavar="STATE:SECONDS,...,STATE",
+        help="states each created run goes through (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        stall_rate=args.stall_rate,
+        stall_ms=args.stall_ms,
+        token=args.token,
+        username=args.username,
+        password=args.password,
+        dags=[
+            {"dag_id": dag_id, "is_paused": False, "is_active": True}
+            for dag_id in args.dag
+        ],
+        run_progression=args.run_progression,
+        outages=args.outage,
+        seed=args.seed,
+    )
+    return config, args.port
+
+
+def main() -> None:
+    config, port = parse_args()
+    stub = AirflowStub(config, port=port)
+    print(f"Airflow stub listening on {stub.url}")
+    stub.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Query and selectively replay the DLQ through its index.
+
+    dlq.py --dlq dlq.jsonl count --dag-id d1 --error-class 5xx --since 24h
+    dlq.py --dlq dlq.jsonl list --dag-id d1
+    dlq.py --dlq dlq.jsonl inspect --since 2024-05-01T00:00:00
+    dlq.py --dlq dlq.jsonl replay --error-class timeout --airflow-url ... --mappings ...
+"""
+
+import argparse
+import json
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from actions.airflow_trigger.dlq import DeadLetterQueue
+from scripts.replay_dlq import add_action_arguments, build_action, replay
+
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse epoch seconds, an ISO 8601 timestamp, or a relative age like ``24h``."""
+    if value is None:
+        return None
+    match = _RELATIVE.match(value)
+    if match:
+        now = time.time() if now is None else now
+        return now - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query and replay the DLQ")
+    parser.add_argument("--dlq", required=True)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("list", "count", "inspect", "replay"):
+        sub = commands.add_parser(name)
+        sub.add_argument("--dag-id")
+        sub.add_argument("--error-class", help="e.g. 5xx, 4xx, timeout, connection")
+        sub.add_argument("--since", help="epoch, ISO 8601 or age such as 24h")
+        sub.add_argument("--until", help="epoch, ISO 8601 or age such as 1h")
+        if name == "replay":
+            add_action_arguments(sub)
+            sub.add_argument("--no-compact", action="store_true")
+    args = parser.parse_args()
+
+    filters = {
+        "dag_id": args.dag_id,
+        "since": parse_time(args.since),
+        "until": parse_time(args.until),
+    }
+    dlq = DeadLetterQueue(args.dlq)
+    if args.command == "replay":
+        replayed = replay(
+            args.dlq,
+            build_action(args),
+            error=args.error_class,
+            compact=not args.no_compact,
+            **filters,
+        )
+        print(f"replayed {replayed} entries")
+        return
+    records = dlq.query(error_class=args.error_class, **filters)
+    if args.command == "count":
+        print(len(records))
+    elif args.command == "list":
+        for record in records:
+            stamp = datetime.fromtimestamp(record.timestamp, timezone.utc).isoformat()
+            print(f"{record.offset}\t{stamp}\t{record.dag_id}\t{record.error_class}")
+    else:
+        for entry in dlq.read(records):
+            print(json.dumps(entry, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Replay DataHub events through the trigger action at a target rate.
+
+Events come from a recorded JSONL file (one event per line) or are generated
+for the mapped event types. Each event is scheduled at ``start + i / rate``
+and latency is measured from its scheduled time, so a stalled Airflow shows
+up as queueing delay rather than a lower offered rate. Without
+``--airflow-url`` a local stub (``scripts/airflow_stub.py``) is started with
+the requested faults:
+
+    PYTHONPATH=. python scripts/load_test.py --rate 200 --count 2000 \
+        --latency lognormal:20,0.6 --error-rate 0.05 --outage 3:2
+
+The report covers throughput, latency percentiles, failed targets, DLQ
+volume and retry amplification: dagRun POSTs (including retries and hedges)
+per distinct dagRun sent. Targets rejected before any POST, e.g. by a failed
+health check during an outage, count as failures but not towards
+amplification.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.retry_budget import RetryBudget
+from scripts.airflow_stub import AirflowStub, StubConfig, parse_outage
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """Read recorded events, one JSON object per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_events(event_types: List[str], count: int) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` distinct events cycling through ``event_types``."""
+    types = itertools.cycle(event_types)
+    for i in range(count):
+        yield {
+            "type": next(types),
+            "entityUrn": f"urn:li:dataset:(urn:li:dataPlatform:hive,load.table_{i % 1000},PROD)",
+            "seq": i,
+        }
+
+
+@dataclass
+class LoadReport:
+    """Outcome of a load run."""
+
+    events: int = 0
+    targets: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    posts: int = 0
+    runs: int = 0
+    dlq_entries: int = 0
+    dlq_bytes: int = 0
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def amplification(self) -> float:
+        """dagRun POSTs per distinct dagRun (1.0 means no retries)."""
+        return self.posts / self.runs if self.runs else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["latencies_ms"]
+        data.update(
+            throughput=round(self.throughput, 1),
+            amplification=round(self.amplification, 3),
+            p50_ms=round(self.percentile(0.5), 1),
+            p95_ms=round(self.percentile(0.95), 1),
+            p99_ms=round(self.percentile(0.99), 1),
+        )
+        return data
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                f"events     {self.events} in {self.elapsed:.2f}s "
+                f"({self.throughput:.1f}/s), {self.targets} targets, {self.failed} failed",
+                f"latency    p50={self.percentile(0.5):.1f}ms "
+                f"p95={self.percentile(0.95):.1f}ms p99={self.percentile(0.99):.1f}ms",
+                f"dlq        {self.dlq_entries} entries, {self.dlq_bytes} bytes",
+                f"retries    {self.posts} POSTs for {self.runs} runs, "
+                f"amplification {self.amplification:.2f}x",
+            ]
+        )
+
+
+class _CountingSession:
+    """Wrap an HTTP session and count dagRun POSTs, including retries and hedges."""
+
+    def __init__(self, session: Any) -> None:
+        self._session = session
+        self._lock = threading.Lock()
+        self.posts = 0
+        self.run_ids: set = set()
+
+    def post(self, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            self.posts += 1
+            self.run_ids.add((kwargs.get("json") or {}).get("dag_run_id"))
+        return self._session.post(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+def run_load(
+    action: AirflowTriggerAction,
+    events: Iterable[Dict[str, Any]],
+    *,
+    rate: float,
+    concurrency: int = 32,
+) -> LoadReport:
+    """Trigger ``events`` open-loop at ``rate`` per second and report the outcome."""
+    session = _CountingSession(action.session)
+    action._session = session
+    report = LoadReport()
+    lock = threading.Lock()
+
+    def handle(event: Dict[str, Any], scheduled: float) -> None:
+        try:
+            results = action.trigger_targets(event)
+            targets, failed = len(results), sum(1 for r in results if not r.ok)
+        except ValueError:
+            targets, failed = 0, 1
+        elapsed_ms = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            report.targets += targets
+            report.failed += failed
+            report.latencies_ms.append(elapsed_ms)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        for i, event in enumerate(events):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(handle, event, scheduled)
+            report.events += 1
+    report.elapsed = time.perf_counter() - start
+    report.posts = session.posts
+    report.runs = len(session.run_ids)
+    if action.dlq is not None:
+        report.dlq_entries = action.dlq.count()
+        if os.path.exists(action.dlq.path):
+            report.dlq_bytes = os.path.getsize(action.dlq.path)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load and fault-injection test")
+    parser.add_argument("--airflow-url", help="target Airflow; default: local stub")
+    parser.add_argument("--mappings", help="default: one synthetic mapping")
+    parser.add_argument("--events-file", help="recorded events, JSONL")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=100.0, help="events per second")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=0.1)
+    parser.add_argument("--timeout", type=int, default=10)
+    parser.add_argument("--retry-budget", type=float, help="retry ratio, e.g. 0.1")
+    parser.add_argument("--hedge-percentile", type=float)
+    parser.add_argument("--token")
+    stub_group = parser.add_argument_group("local stub faults")
+    stub_group.add_argument("--latency", default="lognormal:10,0.5")
+    stub_group.add_argument("--error-rate", type=float, default=0.0)
+    stub_group.add_argument("--throttle-rate", type=float, default=0.0)
+    stub_group.add_argument("--stall-rate", type=float, default=0.0)
+    stub_group.add_argument("--stall-ms", type=float, default=1000.0)
+    stub_group.add_argument(
+        "--outage", type=parse_outage, action="append", default=[], metavar="START:SECONDS"
+    )
+    stub_group.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show trigger logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger("actions.airflow_trigger").setLevel(logging.CRITICAL)
+
+    stub: Optional[AirflowStub] = None
+    airflow_url = args.airflow_url
+    if airflow_url is None:
+        stub = AirflowStub(
+            StubConfig(
+                latency=args.latency,
+                error_rate=args.error_rate,
+                throttle_rate=args.throttle_rate,
+                stall_rate=args.stall_rate,
+                stall_ms=args.stall_ms,
+                token=args.token,
+                outages=args.outage,
+                seed=args.seed,
+            )
+        ).start()
+        airflow_url = stub.url
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mappings = args.mappings
+        if mappings is None:
+            mappings = os.path.join(tmp, "mappings.yaml")
+            with open(mappings, "w", encoding="utf-8") as f:
+                f.write("load_event:\n  dag_id: load_dag\n  conf:\n    urn: '{{ entityUrn }}'\n")
+        action = AirflowTriggerAction(
+            airflow_url,
+            mappings,
+            token=args.token,
+            max_retries=args.max_retries,
+            backoff_factor=args.backoff,
+            request_timeout=args.timeout,
+            dlq_path=os.path.join(tmp, "dlq.jsonl"),
+            mappings_cache_path=os.path.join(tmp, "mappings.cache.json"),
+            hedge_percentile=args.hedge_percentile,
+            hedge_concurrency=args.concurrency,
+            retry_budget=RetryBudget(args.retry_budget) if args.retry_budget else None,
+        )
+        if args.events_file:
+            events: Iterable[Dict[str, Any]] = load_events(args.events_file)[: args.count]
+        else:
+            events = synthetic_events(sorted(action.mappings), args.count)
+        try:
+            report = run_load(action, events, rate=args.rate, concurrency=args.concurrency)
+        finally:
+            action.close()
+            if stub is not None:
+                stub.stop()
+    print(json.dumps(report.summary(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,57 +2,80 @@
 """Replay DLQ events to Airflow."""
 
 import argparse
-import json
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.dlq import DeadLetterQueue, error_class
 
 
-def replay(dlq_path: str, action: AirflowTriggerAction) -> None:
-    """Read events from ``dlq_path`` and attempt to replay them.
+def replay(
+    dlq_path: str,
+    action: AirflowTriggerAction,
+    *,
+    dag_id: Optional[str] = None,
+    error: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    compact: bool = True,
+) -> int:
+    """Replay DLQ entries matching the filters and return how many succeeded.
 
     Successful events are removed from the DLQ. Failed events are written back.
+    Entries recorded for a specific target only re-trigger that target, so a
+    fan-out event does not re-run DAGs that already succeeded. Batched
+    targets are triggered per entry rather than queued, so failures are seen
+    here. With ``compact`` the DLQ file is rewritten without the removed
+    entries.
     """
-    remaining: List[dict] = []
-    try:
-        with open(dlq_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        lines = []
-    for line in lines:
-        if not line.strip():
-            continue
-        entry = json.loads(line)
+    dlq = DeadLetterQueue(dlq_path)
+    records = dlq.query(dag_id=dag_id, error_class=error, since=since, until=until)
+    failed: List[Dict[str, Any]] = []
+    for entry in dlq.read(records):
         event = entry.get("event", {})
+        target = entry.get("dag_id")
         try:
-            action.trigger(event)
+            action.trigger(
+                event, dag_ids=[target] if target else None, batch=False, replay=True
+            )
         except Exception as e:  # pragma: no cover - re-queue failures
             entry["error"] = str(e)
-            remaining.append(entry)
-    with open(dlq_path, "w", encoding="utf-8") as f:
-        for entry in remaining:
-            f.write(json.dumps(entry) + "\n")
+            entry["error_class"] = error_class(e)
+            failed.append(entry)
+    dlq.remove(records)
+    for entry in failed:
+        dlq.append(entry)
+    if compact:
+        dlq.compact()
+    return len(records) - len(failed)
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Replay DLQ events")
+def add_action_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--airflow-url", required=True)
     parser.add_argument("--mappings", required=True)
-    parser.add_argument("--dlq", required=True)
+    parser.add_argument("--mappings-cache")
     parser.add_argument("--username")
     parser.add_argument("--password")
     parser.add_argument("--token")
-    args = parser.parse_args()
 
-    action = AirflowTriggerAction(
+
+def build_action(args: argparse.Namespace) -> AirflowTriggerAction:
+    return AirflowTriggerAction(
         args.airflow_url,
         args.mappings,
         username=args.username,
         password=args.password,
         token=args.token,
         dlq_path=None,
+        mappings_cache_path=args.mappings_cache,
     )
-    replay(args.dlq, action)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay DLQ events")
+    add_action_arguments(parser)
+    parser.add_argument("--dlq", required=True)
+    args = parser.parse_args()
+    replay(args.dlq, build_action(args))
 
 
 if __name__ == "__main__":
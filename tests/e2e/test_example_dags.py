@@ -65,3 +65,10 @@ def test_example_dags_reach_success():
     conf = {"dataset": "urn:li:dataset:(urn:li:dataPlatform:sample,foo,PROD)"}
     for dag_id in ["example_event_dag", "example_quality_check"]:
         _trigger_and_wait(dag_id, conf)
+
+
+def test_quality_check_accepts_dataset_batch():
+    datasets = [
+        f"urn:li:dataset:(urn:li:dataPlatform:sample,foo_{i},PROD)" for i in range(3)
+    ]
+    _trigger_and_wait("example_quality_check", {"datasets": datasets})
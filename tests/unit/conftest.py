@@ -0,0 +1,93 @@
+"""Shared fakes for the Airflow REST API.
+
+Tests get the classes through the ``dummy_response`` and ``airflow_session``
+fixtures and build instances as needed.
+"""
+
+import pytest
+import requests
+
+HEALTHY = {"scheduler": {"status": "healthy"}, "metadatabase": {"status": "healthy"}}
+
+
+class DummyResponse:
+    """Minimal ``requests.Response`` with ``requests`` error semantics."""
+
+    def __init__(self, status_code=200, text="ok", json_data=None):
+        self.status_code = status_code
+        self.text = text
+        self._json = json_data or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(self.text, response=self)
+
+    def json(self):
+        return self._json
+
+
+class FakeAirflowSession:
+    """``requests.Session`` stand-in for the Airflow REST API.
+
+    ``GET /health`` answers with ``health``, or raises it if it is an
+    exception. ``GET /api/v1/dags`` pages through ``dags``, and
+    ``POST /api/v1/dags/~/dagRuns/list`` answers from ``runs``, a dict of
+    ``(dag_id, dag_run_id)`` to state, or raises it if it is an exception.
+    For other POSTs ``post(url, json)`` decides the response and may return
+    just a status code; the default is 200. Every call is recorded in
+    ``calls`` (with its params or JSON body), dagRun POST bodies in ``posts``
+    and their headers in ``headers``.
+    """
+
+    def __init__(self, post=None, dags=None, health=None, runs=None):
+        self.calls = []
+        self.posts = []
+        self.headers = []
+        self._post = post
+        self.dags = dags or []
+        self.runs = {} if runs is None else runs
+        self.health = HEALTHY if health is None else health
+
+    def get(self, url, params=None, headers=None, auth=None, timeout=None):
+        self.calls.append(("GET", url, params))
+        if url.endswith("/api/v1/dags"):
+            offset, limit = params["offset"], params["limit"]
+            return DummyResponse(
+                json_data={
+                    "dags": self.dags[offset : offset + limit],
+                    "total_entries": len(self.dags),
+                }
+            )
+        if isinstance(self.health, Exception):
+            raise self.health
+        return DummyResponse(json_data=self.health)
+
+    def post(self, url, json, headers=None, auth=None, timeout=None):
+        self.calls.append(("POST", url, json))
+        if url.endswith("/dags/~/dagRuns/list"):
+            if isinstance(self.runs, Exception):
+                raise self.runs
+            runs = [
+                {"dag_id": dag_id, "dag_run_id": dag_run_id, "state": state}
+                for (dag_id, dag_run_id), state in self.runs.items()
+                if dag_id in json["dag_ids"] and state in json["states"]
+            ]
+            return DummyResponse(json_data={"dag_runs": runs, "total_entries": len(runs)})
+        self.posts.append((url, json))
+        self.headers.append(headers)
+        response = self._post(url, json) if self._post is not None else 200
+        return DummyResponse(response) if isinstance(response, int) else response
+
+    def patch(self, url, params=None, json=None, headers=None, auth=None, timeout=None):
+        self.calls.append(("PATCH", url, params))
+        return DummyResponse()
+
+
+@pytest.fixture
+def dummy_response():
+    return DummyResponse
+
+
+@pytest.fixture
+def airflow_session():
+    return FakeAirflowSession
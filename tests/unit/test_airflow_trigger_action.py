@@ -1,6 +1,8 @@
 import sys
+import json
 import pathlib
 import logging
+import threading
 import time
 import socket
 
@@ -12,51 +14,22 @@ from actions.airflow_trigger import AirflowTriggerAction
 from actions.airflow_trigger.action import trigger_failures_total
 
 
-class DummyResponse:
-    def __init__(self, status_code: int, text: str = "ok", json_data=None):
-        self.status_code = status_code
-        self.text = text
-        self._json = json_data or {}
-
-    def raise_for_status(self) -> None:
-        if self.status_code >= 400:
-            raise requests.HTTPError(self.text)
-
-    def json(self):
-        return self._json
-
-
-def test_mapping_and_conf(monkeypatch, tmp_path):
+def test_mapping_and_conf(monkeypatch, tmp_path, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n  conf:\n    foo: '{{bar}}'\n")
 
-    session_calls = {}
-
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            session_calls["url"] = url
-            session_calls["json"] = json
-            return DummyResponse(200)
-
-    action = AirflowTriggerAction("http://airflow", str(path), session=Session())
+    session = airflow_session()
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
     event = {"type": "sample_event", "bar": "baz"}
     dag_run_id = action.trigger(event)
 
-    assert session_calls["url"].endswith("/api/v1/dags/d1/dagRuns")
-    assert session_calls["json"]["conf"]["foo"] == "baz"
+    ((url, body),) = session.posts
+    assert url.endswith("/api/v1/dags/d1/dagRuns")
+    assert body["conf"]["foo"] == "baz"
     assert dag_run_id.startswith("d1-")
 
 
-def test_nested_conf(tmp_path):
+def test_nested_conf(tmp_path, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text(
         "sample_event:\n"
@@ -68,90 +41,79 @@ def test_nested_conf(tmp_path):
         "      - '{{bar}}'\n"
     )
 
-    captured = {}
-
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            captured["json"] = json
-            return DummyResponse(200)
-
-    action = AirflowTriggerAction("http://airflow", str(path), session=Session())
+    session = airflow_session()
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
     event = {"type": "sample_event", "bar": "baz"}
     action.trigger(event)
 
-    conf = captured["json"]["conf"]
+    conf = session.posts[0][1]["conf"]
     assert conf["outer"]["inner"] == "baz"
     assert conf["list"][0] == "baz"
 
 
+def test_request_shares_constants(tmp_path, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "sample_event:\n"
+        "  dag_id: d1\n"
+        "  conf:\n"
+        "    urn: '{{bar}}'\n"
+        "    options:\n"
+        "      checks: [rows, freshness]\n"
+    )
+    session = airflow_session()
+    action = AirflowTriggerAction("http://airflow", str(path), session=session, token="t")
+    action.trigger({"type": "sample_event", "bar": "a"})
+    action.trigger({"type": "sample_event", "bar": "b"})
+
+    (url1, body1), (url2, body2) = session.posts
+    headers1, headers2 = session.headers
+    assert url1 is url2
+    assert body1["conf"]["options"] is body2["conf"]["options"]
+    assert (body1["conf"]["urn"], body2["conf"]["urn"]) == ("a", "b")
+    assert headers1["Authorization"] == "Bearer t"
+    assert headers1["X-Correlation-ID"] == body1["conf"]["correlation_id"]
+    assert headers1["X-Correlation-ID"] != headers2["X-Correlation-ID"]
+    assert "X-Correlation-ID" not in action._headers
+
+    (target,) = action.mappings["sample_event"]["targets"]
+    request = action._build_request([{"type": "sample_event", "bar": "c"}], target, "cid")
+    assert not hasattr(request, "__dict__")
+    with pytest.raises(AttributeError):
+        request.dag_id = "other"
+
+
 def test_idempotent_dag_run_id(tmp_path):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: test\n")
     action = AirflowTriggerAction("http://airflow", str(path))
     event = {"type": "sample_event", "id": 1}
-    first = action._dag_run_id("test", event)
-    second = action._dag_run_id("test", event)
+    first = action.dag_run_id("test", event)
+    second = action.dag_run_id("test", event)
     assert first == second
 
 
-def test_retry_on_server_error(tmp_path, monkeypatch):
+def test_retry_on_server_error(tmp_path, monkeypatch, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
-    calls = {"count": 0}
     sleeps = []
-
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            calls["count"] += 1
-            if calls["count"] < 3:
-                return DummyResponse(500, "error")
-            return DummyResponse(200)
+    session = airflow_session(post=lambda url, json: 500 if len(session.posts) < 3 else 200)
 
     monkeypatch.setattr(time, "sleep", lambda s: sleeps.append(s))
-    action = AirflowTriggerAction("http://airflow", str(path), session=Session())
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
     event = {"type": "sample_event"}
     dag_run_id = action.trigger(event)
-    assert calls["count"] == 3
+    assert len(session.posts) == 3
     assert sleeps == [0.5, 1.0]
     assert dag_run_id.startswith("d1-")
 
 
-def test_unauthorized(tmp_path):
+def test_unauthorized(tmp_path, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
 
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            return DummyResponse(401, "unauthorized")
-
-    action = AirflowTriggerAction("http://airflow", str(path), session=Session())
+    session = airflow_session(post=lambda url, json: 401)
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
     event = {"type": "sample_event"}
     try:
         action.trigger(event)
@@ -174,39 +136,23 @@ def test_non_whitelisted(tmp_path):
         assert False, "Expected ValueError"
 
 
-def test_correlation_id_and_metrics(tmp_path, caplog):
+def test_correlation_id_and_metrics(tmp_path, caplog, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
 
-    captured = {}
-
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            captured["headers"] = headers
-            captured["json"] = json
-            return DummyResponse(200)
-
+    session = airflow_session()
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(("", 0))
         port = s.getsockname()[1]
     start_http_server(port)
-    action = AirflowTriggerAction("http://airflow", str(path), session=Session())
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
     event = {"type": "sample_event"}
 
     with caplog.at_level(logging.INFO):
         action.trigger(event)
 
-    corr_id = captured["headers"]["X-Correlation-ID"]
-    assert captured["json"]["conf"]["correlation_id"] == corr_id
+    corr_id = session.headers[0]["X-Correlation-ID"]
+    assert session.posts[0][1]["conf"]["correlation_id"] == corr_id
     record = next(r for r in caplog.records if "triggered dag" in r.message)
     assert getattr(record, "correlation_id") == corr_id
 
@@ -215,25 +161,15 @@ def test_correlation_id_and_metrics(tmp_path, caplog):
     assert "latency_ms" in metrics
 
 
-def test_failure_metric(tmp_path):
+def test_failure_metric(tmp_path, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
 
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            return DummyResponse(500, "error")
-
     action = AirflowTriggerAction(
-        "http://airflow", str(path), session=Session(), max_retries=1
+        "http://airflow",
+        str(path),
+        session=airflow_session(post=lambda url, json: 500),
+        max_retries=1,
     )
     before = trigger_failures_total._value.get()
     with pytest.raises(requests.HTTPError):
@@ -241,29 +177,19 @@ def test_failure_metric(tmp_path):
     assert trigger_failures_total._value.get() == before + 1
 
 
-def test_dlq_on_timeout(tmp_path, monkeypatch):
+def test_dlq_on_timeout(tmp_path, monkeypatch, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
     dlq = tmp_path / "dlq.jsonl"
 
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            raise requests.Timeout("down")
+    def post(url, json):
+        raise requests.Timeout("down")
 
     monkeypatch.setattr(time, "sleep", lambda s: None)
     action = AirflowTriggerAction(
         "http://airflow",
         str(path),
-        session=Session(),
+        session=airflow_session(post=post),
         dlq_path=str(dlq),
         max_retries=2,
     )
@@ -273,83 +199,174 @@ def test_dlq_on_timeout(tmp_path, monkeypatch):
     assert len(lines) == 1
 
 
-def test_replay_script(tmp_path, monkeypatch):
+def test_replay_script(tmp_path, monkeypatch, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
     dlq = tmp_path / "dlq.jsonl"
 
-    class FailSession:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            raise requests.ConnectionError("down")
+    def post(url, json):
+        raise requests.ConnectionError("down")
 
     monkeypatch.setattr(time, "sleep", lambda s: None)
     failing_action = AirflowTriggerAction(
         "http://airflow",
         str(path),
-        session=FailSession(),
+        session=airflow_session(post=post),
         dlq_path=str(dlq),
         max_retries=1,
     )
     with pytest.raises(requests.ConnectionError):
         failing_action.trigger({"type": "sample_event"})
 
-    calls = {"count": 0}
-
-    class SuccessSession:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={
-                    "scheduler": {"status": "healthy"},
-                    "metadatabase": {"status": "healthy"},
-                },
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            calls["count"] += 1
-            return DummyResponse(200)
-
+    session = airflow_session()
     action = AirflowTriggerAction(
         "http://airflow",
         str(path),
-        session=SuccessSession(),
+        session=session,
         dlq_path=None,
     )
     from scripts import replay_dlq
 
     replay_dlq.replay(str(dlq), action)
-    assert calls["count"] == 1
+    assert len(session.posts) == 1
     assert dlq.read_text() == ""
 
 
-def test_circuit_breaker(tmp_path):
+def test_circuit_breaker(tmp_path, airflow_session):
     path = tmp_path / "mappings.yaml"
     path.write_text("sample_event:\n  dag_id: d1\n")
     dlq = tmp_path / "dlq.jsonl"
 
-    class Session:
-        def get(self, url, timeout=None):
-            return DummyResponse(
-                200,
-                json_data={"scheduler": {"status": "unhealthy"}},
-            )
-
-        def post(self, url, json, headers, auth, timeout=None):
-            raise AssertionError("should not post when unhealthy")
-
+    session = airflow_session(health={"scheduler": {"status": "unhealthy"}})
     action = AirflowTriggerAction(
-        "http://airflow", str(path), session=Session(), dlq_path=str(dlq)
+        "http://airflow", str(path), session=session, dlq_path=str(dlq)
     )
     with pytest.raises(RuntimeError):
         action.trigger({"type": "sample_event"})
+    assert session.posts == []
     lines = dlq.read_text().strip().splitlines()
     assert len(lines) == 1
+
+
+def test_fanout_triggers_targets_in_parallel(tmp_path, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "sample_event:\n"
+        "  targets:\n"
+        "    - dag_id: ingest\n"
+        "      conf:\n"
+        "        urn: '{{urn}}'\n"
+        "    - dag_id: quality\n"
+        "      conf:\n"
+        "        dataset: '{{urn}}'\n"
+    )
+    barrier = threading.Barrier(2, timeout=5)
+
+    def post(url, json):
+        barrier.wait()
+        return 200
+
+    session = airflow_session(post=post)
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
+    results = action.trigger_targets({"type": "sample_event", "urn": "u1"})
+
+    posted = {url.split("/")[-2]: body for url, body in session.posts}
+    assert [r.dag_id for r in results] == ["ingest", "quality"]
+    assert all(r.ok for r in results)
+    assert posted["ingest"]["conf"]["urn"] == "u1"
+    assert posted["quality"]["conf"]["dataset"] == "u1"
+    assert len({h["X-Correlation-ID"] for h in session.headers}) == 1
+    assert results[0].dag_run_id.startswith("ingest-")
+    assert results[1].dag_run_id.startswith("quality-")
+
+
+def test_fanout_pool_created_once_under_concurrency(tmp_path, monkeypatch, airflow_session):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from actions.airflow_trigger import action as action_mod
+
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  targets:\n    - dag_id: a\n    - dag_id: b\n")
+    pools = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.01)
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(action_mod, "ThreadPoolExecutor", CountingPool)
+    action = AirflowTriggerAction("http://airflow", str(path), session=airflow_session())
+    threads = [
+        threading.Thread(
+            target=action.trigger_targets, args=({"type": "sample_event", "n": i},)
+        )
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    action.close()
+    assert len(pools) == 1
+    assert pools[0]._shutdown
+
+
+def test_fanout_dlq_and_replay_per_target(tmp_path, monkeypatch, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "sample_event:\n"
+        "  targets:\n"
+        "    - dag_id: ok_dag\n"
+        "    - dag_id: bad_dag\n"
+    )
+    dlq = tmp_path / "dlq.jsonl"
+    failing = {"bad_dag"}
+
+    session = airflow_session(
+        post=lambda url, json: 500 if url.split("/")[-2] in failing else 200
+    )
+    monkeypatch.setattr(time, "sleep", lambda s: None)
+    action = AirflowTriggerAction(
+        "http://airflow", str(path), session=session, dlq_path=str(dlq), max_retries=1
+    )
+    with pytest.raises(requests.HTTPError):
+        action.trigger({"type": "sample_event"})
+    assert sorted(url.split("/")[-2] for url, _ in session.posts) == ["bad_dag", "ok_dag"]
+    entries = [json.loads(line) for line in dlq.read_text().splitlines()]
+    assert [e["dag_id"] for e in entries] == ["bad_dag"]
+
+    from scripts import replay_dlq
+
+    session.posts.clear()
+    failing.clear()
+    replay_dlq.replay(str(dlq), action)
+    assert [url.split("/")[-2] for url, _ in session.posts] == ["bad_dag"]
+    assert dlq.read_text() == ""
+
+
+@pytest.mark.parametrize(
+    "mappings, reason",
+    [
+        ("sample_event:\n  dag_id: other_dag\n", "no longer mapped"),
+        ("sample_event:\n  dag_id: bad_dag\n  when: n > 1\n", "filtered by predicate"),
+    ],
+)
+def test_replay_keeps_entry_for_unselected_target(tmp_path, airflow_session, mappings, reason):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(mappings)
+    dlq = tmp_path / "dlq.jsonl"
+    dlq.write_text(
+        json.dumps({"event": {"type": "sample_event", "n": 1}, "dag_id": "bad_dag"}) + "\n"
+    )
+    session = airflow_session()
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
+
+    from scripts import replay_dlq
+
+    assert replay_dlq.replay(str(dlq), action) == 0
+    action.close()
+    assert session.posts == []
+    (entry,) = [json.loads(line) for line in dlq.read_text().splitlines()]
+    assert entry["dag_id"] == "bad_dag"
+    assert entry["error"] == f"target bad_dag {reason} for sample_event"
@@ -0,0 +1,117 @@
+import json
+import pathlib
+import sys
+import threading
+import time
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.batching import BatchBuffer
+
+
+def make_action(tmp_path, session, max_size=3, max_wait=60, **kwargs):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "dataset_tagged:\n"
+        "  targets:\n"
+        "    - dag_id: quality\n"
+        "      conf:\n"
+        "        dataset: '{{urn}}'\n"
+        "        source: datahub\n"
+        "      batch:\n"
+        "        field: dataset\n"
+        "        into: datasets\n"
+        f"        max_size: {max_size}\n"
+        f"        max_wait: {max_wait}\n"
+        "    - dag_id: ingest\n"
+    )
+    return AirflowTriggerAction("http://airflow", str(path), session=session, **kwargs)
+
+
+def test_buffer_flushes_when_full():
+    flushed = []
+    buffer = BatchBuffer(lambda key, items: flushed.append((key, items)))
+    for i in range(5):
+        buffer.add("a", i, max_size=2, max_wait=60)
+    assert flushed == [("a", [0, 1]), ("a", [2, 3])]
+    assert buffer.pending == 1
+    buffer.close()
+    assert flushed[-1] == ("a", [4])
+
+
+def test_buffer_flushes_when_due():
+    flushed = threading.Event()
+    buffer = BatchBuffer(lambda key, items: flushed.set())
+    buffer.add("a", 1, max_size=10, max_wait=0.05)
+    assert flushed.wait(2)
+    assert buffer.pending == 0
+    buffer.close()
+
+
+def test_batched_target_packs_events(tmp_path, airflow_session):
+    session = airflow_session()
+    action = make_action(tmp_path, session)
+    results = action.trigger_targets({"type": "dataset_tagged", "urn": "u0"})
+    assert [(r.dag_id, r.dag_run_id is None) for r in results] == [
+        ("quality", True),
+        ("ingest", False),
+    ]
+    action.trigger({"type": "dataset_tagged", "urn": "u1"})
+    action.trigger({"type": "dataset_tagged", "urn": "u2"})
+    runs = [body for url, body in session.posts if "/quality/" in url]
+    assert len(runs) == 1
+    assert runs[0]["conf"]["datasets"] == ["u0", "u1", "u2"]
+    assert runs[0]["conf"]["source"] == "datahub"
+    assert "dataset" not in runs[0]["conf"]
+    assert len([url for url, _ in session.posts if "/ingest/" in url]) == 3
+    action.close()
+
+
+def test_close_flushes_partial_batch(tmp_path, airflow_session):
+    session = airflow_session()
+    action = make_action(tmp_path, session)
+    action.trigger({"type": "dataset_tagged", "urn": "u0"}, dag_ids=["quality"])
+    assert session.posts == []
+    action.close()
+    ((_, body),) = session.posts
+    assert body["conf"]["datasets"] == ["u0"]
+
+
+def test_batch_flushes_after_max_wait(tmp_path, airflow_session):
+    session = airflow_session()
+    action = make_action(tmp_path, session, max_wait=0.05)
+    action.trigger({"type": "dataset_tagged", "urn": "u0"}, dag_ids=["quality"])
+    deadline = time.monotonic() + 2
+    while not session.posts and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(session.posts) == 1
+    action.close()
+
+
+def test_failed_batch_writes_dlq_per_event(tmp_path, airflow_session):
+    dlq = tmp_path / "dlq.jsonl"
+    action = make_action(
+        tmp_path,
+        airflow_session(post=lambda url, json: 400),
+        max_size=2,
+        dlq_path=str(dlq),
+        max_retries=1,
+    )
+    for urn in ("u0", "u1"):
+        action.trigger({"type": "dataset_tagged", "urn": urn}, dag_ids=["quality"])
+    action.close()
+    entries = [json.loads(line) for line in dlq.read_text().splitlines()]
+    assert [e["event"]["urn"] for e in entries] == ["u0", "u1"]
+    assert entries[0]["dag_run_id"] == entries[1]["dag_run_id"]
+
+
+def test_unbatched_trigger_posts_single_item_batch(tmp_path, airflow_session):
+    session = airflow_session()
+    action = make_action(tmp_path, session)
+    dag_run_id = action.trigger(
+        {"type": "dataset_tagged", "urn": "u0"}, dag_ids=["quality"], batch=False
+    )
+    ((_, body),) = session.posts
+    assert body["dag_run_id"] == dag_run_id
+    assert body["conf"]["datasets"] == ["u0"]
+    action.close()
@@ -0,0 +1,28 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger.conf_template import compile_conf
+
+
+def test_placeholders_resolved_at_any_depth():
+    build = compile_conf(
+        {"urn": "{{ entityUrn }}", "nested": {"a": ["{{x}}", 1]}, "missing": "{{nope}}"}
+    )
+    assert build({"entityUrn": "u1", "x": 2}) == {
+        "urn": "u1",
+        "nested": {"a": [2, 1]},
+        "missing": None,
+    }
+
+
+def test_constant_subtrees_are_shared():
+    options = {"checks": ["rows", "freshness"], "limits": {"rows": 10}}
+    mixed = {"fixed": [1, 2], "urn": "{{urn}}"}
+    build = compile_conf({"options": options, "mixed": mixed, "source": "datahub"})
+    first, second = build({"urn": "u1"}), build({"urn": "u2"})
+    assert first is not second
+    assert first["options"] is second["options"] is options
+    assert first["mixed"] is not second["mixed"]
+    assert first["mixed"]["fixed"] is mixed["fixed"]
+    assert (first["mixed"]["urn"], second["mixed"]["urn"]) == ("u1", "u2")
@@ -0,0 +1,163 @@
+import pathlib
+import sys
+import threading
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.dag_cache import DagMetadataCache
+from actions.airflow_trigger.metrics import dag_cache_lookups_total
+
+DAGS = [
+    {"dag_id": "d1", "is_paused": False, "is_active": True},
+    {"dag_id": "paused", "is_paused": True, "is_active": True},
+    {"dag_id": "gone", "is_paused": False, "is_active": False},
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session(airflow_session):
+    return airflow_session(dags=DAGS)
+
+
+def mappings(tmp_path, dag_id):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(f"sample_event:\n  dag_id: {dag_id}\n")
+    return str(path)
+
+
+def test_refresh_paginates(session):
+    cache = DagMetadataCache("http://airflow", session, page_size=2)
+    assert cache.rejection("d1") is None and not cache.loaded
+    assert cache.refresh()
+    assert [c[2]["offset"] for c in session.calls] == [0, 2]
+    assert cache.validate(["d1", "paused", "gone", "missing"]) == {
+        "paused": "paused",
+        "gone": "inactive",
+        "missing": "not found",
+    }
+
+
+def test_lookup_metrics(session):
+    cache = DagMetadataCache("http://airflow", session)
+    cache.refresh()
+    hits = dag_cache_lookups_total.labels(result="hit")._value.get()
+    misses = dag_cache_lookups_total.labels(result="miss")._value.get()
+    cache.get("d1")
+    cache.get("missing")
+    assert dag_cache_lookups_total.labels(result="hit")._value.get() == hits + 1
+    assert dag_cache_lookups_total.labels(result="miss")._value.get() == misses + 1
+
+
+def test_inactive_dag_rejected_without_round_trip(tmp_path, session):
+    dlq = tmp_path / "dlq.jsonl"
+    action = AirflowTriggerAction(
+        "http://airflow",
+        mappings(tmp_path, "gone"),
+        session=session,
+        dlq_path=str(dlq),
+        dag_cache_refresh_interval=3600,
+    )
+    session.calls.clear()
+    with pytest.raises(ValueError, match="inactive"):
+        action.trigger({"type": "sample_event"})
+    action.close()
+    assert session.calls == []
+    assert len(dlq.read_text().splitlines()) == 1
+
+
+def test_dag_added_between_refreshes_is_triggered(tmp_path, session):
+    dlq = tmp_path / "dlq.jsonl"
+    action = AirflowTriggerAction(
+        "http://airflow",
+        mappings(tmp_path, "deployed_later"),
+        session=session,
+        dlq_path=str(dlq),
+        dag_cache_refresh_interval=3600,
+        dag_cache_miss_refresh_interval=0,
+    )
+    session.dags = DAGS + [{"dag_id": "deployed_later", "is_paused": False}]
+    session.calls.clear()
+    assert action.trigger({"type": "sample_event"}).startswith("deployed_later-")
+    action.close()
+    assert [c[1].rsplit("/", 1)[-1] for c in session.calls] == ["dags", "health", "dagRuns"]
+    assert not dlq.exists()
+
+
+def test_unknown_dag_rejected_after_one_refresh(tmp_path, session):
+    dlq = tmp_path / "dlq.jsonl"
+    action = AirflowTriggerAction(
+        "http://airflow",
+        mappings(tmp_path, "missing"),
+        session=session,
+        dlq_path=str(dlq),
+        dag_cache_refresh_interval=3600,
+        dag_cache_miss_refresh_interval=0,
+    )
+    session.calls.clear()
+    with pytest.raises(ValueError, match="not found"):
+        action.trigger({"type": "sample_event"})
+    action.close()
+    assert [c[1].rsplit("/", 1)[-1] for c in session.calls] == ["dags"]
+    assert len(dlq.read_text().splitlines()) == 1
+
+
+def test_misses_share_rate_limited_refresh(session):
+    clock = Clock()
+    cache = DagMetadataCache(
+        "http://airflow", session, miss_refresh_interval=10, clock=clock
+    )
+    assert cache.refresh()
+    session.calls.clear()
+    assert cache.rejection("missing") == "not found"
+    assert session.calls == []
+
+    clock.now += 10
+    threads = [
+        threading.Thread(target=cache.rejection, args=("missing",)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(session.calls) == 1
+
+    session.dags = None
+    clock.now += 10
+    assert cache.rejection("missing") is None
+
+
+def test_paused_dag_unpaused_when_enabled(tmp_path, session):
+    action = AirflowTriggerAction(
+        "http://airflow",
+        mappings(tmp_path, "paused"),
+        session=session,
+        dag_cache_refresh_interval=3600,
+        unpause_paused_dags=True,
+    )
+    action.trigger({"type": "sample_event"})
+    action.close()
+    methods = [c[0] for c in session.calls]
+    assert methods.count("PATCH") == 1
+    assert methods[-1] == "POST"
+    assert action.dag_cache.rejection("paused") is None
+
+
+def test_strict_validation(tmp_path, session):
+    with pytest.raises(ValueError, match="gone"):
+        AirflowTriggerAction(
+            "http://airflow",
+            mappings(tmp_path, "gone"),
+            session=session,
+            dag_cache_refresh_interval=3600,
+            strict_dag_validation=True,
+        )
@@ -0,0 +1,129 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import requests
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger.dlq import DeadLetterQueue, DlqEntry, error_class
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+
+def entry(dag_id, klass, ts, n=0):
+    return {
+        "timestamp": ts,
+        "event": {"type": "sample_event", "n": n},
+        "dag_id": dag_id,
+        "dag_run_id": f"{dag_id}-{n}",
+        "error": "boom",
+        "error_class": klass,
+    }
+
+
+def fill(path):
+    dlq = DeadLetterQueue(str(path))
+    dlq.append(entry("d1", "5xx", 100, 1))
+    dlq.append(entry("d2", "5xx", 200, 2))
+    dlq.append(entry("d1", "timeout", 300, 3))
+    dlq.append(entry("d1", "5xx", 400, 4))
+    return dlq
+
+
+def test_query_filters_and_read(tmp_path):
+    dlq = fill(tmp_path / "dlq.jsonl")
+    records = dlq.query(dag_id="d1", error_class="5xx", since=150)
+    assert [r.timestamp for r in records] == [400]
+    assert [e["event"]["n"] for e in dlq.read(records)] == [4]
+    assert dlq.count() == 4
+    assert dlq.count(dag_id="d1") == 3
+    assert dlq.count(error_class="timeout") == 1
+    assert dlq.count(until=250) == 2
+
+
+def test_index_persisted_and_caught_up(tmp_path):
+    path = tmp_path / "dlq.jsonl"
+    fill(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry("d3", "4xx", 500, 5)) + "\n")
+    fresh = DeadLetterQueue(str(path))
+    assert fresh.count(dag_id="d3") == 1
+    index_lines = (tmp_path / "dlq.jsonl.idx").read_text().splitlines()
+    assert len(index_lines) == 5
+
+
+def test_index_rebuilt_after_rewrite(tmp_path):
+    path = tmp_path / "dlq.jsonl"
+    fill(path)
+    path.write_text(json.dumps(entry("d9", "5xx", 1)) + "\n")
+    assert [r.dag_id for r in DeadLetterQueue(str(path)).query()] == ["d9"]
+
+
+def test_remove_and_compact(tmp_path):
+    path = tmp_path / "dlq.jsonl"
+    dlq = fill(path)
+    dlq.remove(dlq.query(dag_id="d1"))
+    assert dlq.count() == 1
+    assert DeadLetterQueue(str(path)).count() == 1
+    dlq.compact()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["dag_id"] for line in lines] == ["d2"]
+    assert [e["dag_id"] for e in DeadLetterQueue(str(path)).read(dlq.query())] == ["d2"]
+
+
+def test_error_class():
+    response = requests.Response()
+    response.status_code = 503
+    assert error_class(requests.HTTPError("x", response=response)) == "5xx"
+    assert error_class(requests.Timeout("x")) == "timeout"
+    assert error_class(requests.ConnectionError("x")) == "connection"
+    assert error_class(ValueError("x")) == "ValueError"
+
+
+def test_selective_replay(tmp_path):
+    path = tmp_path / "dlq.jsonl"
+    fill(path)
+    triggered = []
+
+    class Action:
+        def trigger(self, event, dag_ids=None, batch=True, replay=False):
+            triggered.append((event["n"], dag_ids))
+
+    from scripts import replay_dlq
+
+    assert replay_dlq.replay(str(path), Action(), dag_id="d1", error="5xx") == 2
+    assert triggered == [(1, ["d1"]), (4, ["d1"])]
+    remaining = [json.loads(line)["event"]["n"] for line in path.read_text().splitlines()]
+    assert remaining == [2, 3]
+
+
+def test_cli_count_and_parse_time(tmp_path):
+    path = tmp_path / "dlq.jsonl"
+    fill(path)
+    out = subprocess.run(
+        [sys.executable, "scripts/dlq.py", "--dlq", str(path), "count", "--dag-id", "d1",
+         "--since", "1970-01-01T00:03:00"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "2"
+
+    from scripts.dlq import parse_time
+
+    assert parse_time("24h", now=100000.0) == 100000.0 - 86400
+    assert parse_time("12.5") == 12.5
+
+
+def test_record_entry_serialized_like_dict(tmp_path):
+    record_dlq = DeadLetterQueue(str(tmp_path / "records.jsonl"))
+    dict_dlq = DeadLetterQueue(str(tmp_path / "dicts.jsonl"))
+    record = DlqEntry(100.0, {"type": "sample_event", "n": 1}, "d1", "d1-1", "boom", "5xx")
+    index = record_dlq.append(record)
+    assert index == dict_dlq.append(record._asdict())
+    assert (tmp_path / "records.jsonl").read_bytes() == (tmp_path / "dicts.jsonl").read_bytes()
+    assert record_dlq.query(dag_id="d1", error_class="5xx") == [index]
@@ -0,0 +1,111 @@
+import pathlib
+import sys
+import threading
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.hedging import HedgeBudget, Hedger, LatencyTracker
+
+
+def warm(hedger, key, samples=20, seconds=0.001):
+    for _ in range(samples):
+        hedger.latency.record(key, seconds)
+        hedger.budget.earn()
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile("d1", 0.9) is None
+    for ms in range(1, 101):
+        tracker.record("d1", ms / 1000)
+    assert tracker.percentile("d1", 0.9) == 0.091
+    assert tracker.percentile("d2", 0.9) is None
+
+
+def test_budget_limits_hedges():
+    budget = HedgeBudget(ratio=0.5, burst=1)
+    assert not budget.try_spend()
+    budget.earn()
+    budget.earn()
+    budget.earn()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_fast_request_not_hedged(dummy_response):
+    hedger = Hedger(min_samples=1)
+    calls = []
+    response, hedged = hedger.call("d1", lambda: calls.append(1) or dummy_response(200))
+    assert response.status_code == 200 and not hedged and calls == [1]
+    hedger.shutdown()
+
+
+def test_stalled_request_hedged(dummy_response):
+    hedger = Hedger(budget_ratio=1.0)
+    warm(hedger, "d1")
+    release = threading.Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return dummy_response(409)
+        return dummy_response(200)
+
+    response, hedged = hedger.call("d1", request)
+    release.set()
+    assert hedged and response.status_code == 200 and len(calls) == 2
+    hedger.shutdown()
+
+
+def test_no_hedge_without_budget(dummy_response):
+    hedger = Hedger(budget_ratio=0.0)
+    warm(hedger, "d1")
+    calls = []
+
+    def request():
+        calls.append(1)
+        threading.Event().wait(0.05)
+        return dummy_response(200)
+
+    _, hedged = hedger.call("d1", request)
+    assert not hedged and calls == [1]
+    hedger.shutdown()
+
+
+def test_queue_wait_neither_hedges_nor_counts_as_latency(dummy_response):
+    hedger = Hedger(budget_ratio=1.0, max_workers=1)
+    warm(hedger, "d1")
+    busy = hedger._executor.submit(threading.Event().wait, 0.2)
+    calls = []
+    response, hedged = hedger.call("d1", lambda: calls.append(1) or dummy_response(200))
+    busy.result()
+    assert not hedged and calls == [1]
+    assert hedger.latency.percentile("d1", 1.0) < 0.1
+    hedger.shutdown()
+
+
+def test_action_treats_hedge_conflict_as_success(tmp_path, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    release = threading.Event()
+
+    def post(url, json):
+        count = len(session.posts)
+        if count == 2:
+            release.wait(5)
+        return 409 if count > 2 else 200
+
+    session = airflow_session(post=post)
+    action = AirflowTriggerAction(
+        "http://airflow", str(path), session=session, hedge_percentile=0.5, hedge_budget=1.0
+    )
+    action.hedger.min_samples = 1
+    action.hedger.budget.earn()
+    action.trigger({"type": "sample_event", "id": 1})
+    dag_run_id = action.trigger({"type": "sample_event", "id": 2})
+    release.set()
+    action.close()
+    assert dag_run_id.startswith("d1-")
+    assert len(session.posts) == 3
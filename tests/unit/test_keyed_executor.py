@@ -0,0 +1,92 @@
+import os
+import pathlib
+import queue
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger.keyed_executor import KeyedExecutor
+
+
+def pid_handler_factory():
+    def handle(event):
+        if event.get("fail"):
+            raise ValueError("boom")
+        return os.getpid(), event["seq"]
+
+    return handle
+
+
+def test_order_preserved_per_key():
+    seen = {}
+    lock = threading.Lock()
+
+    def handle(event):
+        time.sleep(random.uniform(0, 0.002))
+        with lock:
+            seen.setdefault(event["entityUrn"], []).append(event["seq"])
+
+    executor = KeyedExecutor(lambda: handle, lanes=4)
+    futures = [
+        executor.submit({"entityUrn": f"urn:{i % 5}", "seq": i}) for i in range(100)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    executor.shutdown()
+    for urn, seqs in seen.items():
+        assert seqs == sorted(seqs), urn
+    assert sum(len(s) for s in seen.values()) == 100
+
+
+def test_different_keys_run_in_parallel():
+    barrier = threading.Barrier(2, timeout=5)
+    executor = KeyedExecutor(lambda: lambda event: barrier.wait(), lanes=8)
+    keys = ["a", "b", "c", "d"]
+    lanes = {k: executor.lane_for({"entityUrn": k}) for k in keys}
+    first, second = next(
+        (a, b) for a in keys for b in keys if lanes[a] != lanes[b]
+    )
+    futures = [executor.submit({"entityUrn": first}), executor.submit({"entityUrn": second})]
+    for future in futures:
+        future.result(timeout=5)
+    executor.shutdown()
+
+
+def test_custom_key_and_errors():
+    executor = KeyedExecutor(
+        pid_handler_factory, lanes=2, key="entity.urn", queue_size=10
+    )
+    ok = executor.submit({"entity": {"urn": "u"}, "seq": 1})
+    bad = executor.submit({"entity": {"urn": "u"}, "seq": 2, "fail": True})
+    assert ok.result(timeout=5)[1] == 1
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    executor.shutdown()
+
+
+def test_lane_queue_bound():
+    release = threading.Event()
+    executor = KeyedExecutor(lambda: lambda event: release.wait(5), lanes=1, queue_size=1)
+    executor.submit({"entityUrn": "u"})
+    time.sleep(0.05)
+    executor.submit({"entityUrn": "u"})
+    with pytest.raises(queue.Full):
+        executor.submit({"entityUrn": "u"}, timeout=0.05)
+    release.set()
+    executor.shutdown()
+
+
+def test_shards_mode_uses_processes():
+    executor = KeyedExecutor(pid_handler_factory, lanes=2, mode="shards")
+    futures = [executor.submit({"entityUrn": f"urn:{i}", "seq": i}) for i in range(20)]
+    results = [f.result(timeout=30) for f in futures]
+    failed = executor.submit({"entityUrn": "urn:0", "seq": 0, "fail": True})
+    with pytest.raises(ValueError):
+        failed.result(timeout=30)
+    executor.shutdown()
+    assert [seq for _, seq in results] == list(range(20))
+    assert os.getpid() not in {pid for pid, _ in results}
@@ -0,0 +1,216 @@
+import json
+import os
+import pathlib
+import signal
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.lifecycle import LifecycleManager, ShuttingDown
+from scripts.airflow_stub import AirflowStub, StubConfig
+
+
+def write_mappings(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("load_event:\n  dag_id: load_dag\n  conf:\n    seq: '{{seq}}'\n")
+    return str(path)
+
+
+def dlq_seqs(path):
+    if not path.exists():
+        return set()
+    return {json.loads(line)["event"]["seq"] for line in path.read_text().splitlines()}
+
+
+def test_no_events_lost_on_sigterm_under_load(tmp_path):
+    dlq = tmp_path / "dlq.jsonl"
+    stub = AirflowStub(StubConfig(latency="uniform:5,30", error_rate=0.3, seed=7)).start()
+    action = AirflowTriggerAction(
+        stub.url,
+        write_mappings(tmp_path),
+        backoff_factor=0.2,
+        dlq_path=str(dlq),
+    )
+    manager = LifecycleManager(action, lanes=4, drain_timeout=1.0)
+    previous = manager.install_signal_handlers([signal.SIGTERM])
+    accepted = []
+
+    def produce():
+        for seq in range(2000):
+            try:
+                manager.submit({"type": "load_event", "seq": seq})
+            except ShuttingDown:
+                return
+            accepted.append(seq)
+            time.sleep(0.001)
+
+    producer = threading.Thread(target=produce)
+    try:
+        producer.start()
+        time.sleep(0.3)
+        os.kill(os.getpid(), signal.SIGTERM)
+        report = manager.wait_for_shutdown(timeout=5)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    producer.join(5)
+    stub.stop()
+
+    assert report is not None and report.drained > 0 and report.persisted > 0
+    assert report.elapsed < 5
+    assert len(accepted) < 2000
+    triggered = {
+        int(run["conf"]["seq"]) for runs in stub.runs.values() for run in runs.values()
+    }
+    lost = set(accepted) - triggered - dlq_seqs(dlq)
+    assert not lost
+
+
+def test_submit_after_shutdown_raises(tmp_path, airflow_session):
+    action = AirflowTriggerAction(
+        "http://airflow",
+        write_mappings(tmp_path),
+        session=airflow_session(health=requests.ConnectionError("down")),
+    )
+    manager = LifecycleManager(action, drain_timeout=1)
+    manager.request_shutdown()
+    with pytest.raises(ShuttingDown):
+        manager.submit({"type": "load_event", "seq": 1})
+    report = manager.shutdown()
+    assert report.drained == report.persisted == 0
+    assert manager.shutdown() is report
+
+
+@pytest.mark.parametrize("env, expected", [(None, 30.0), ("12.5", 12.5)])
+def test_drain_timeout_from_environment(tmp_path, monkeypatch, airflow_session, env, expected):
+    if env is None:
+        monkeypatch.delenv("SHUTDOWN_DRAIN_TIMEOUT", raising=False)
+    else:
+        monkeypatch.setenv("SHUTDOWN_DRAIN_TIMEOUT", env)
+    action = AirflowTriggerAction(
+        "http://airflow",
+        write_mappings(tmp_path),
+        session=airflow_session(health=requests.ConnectionError("down")),
+    )
+    for manager, timeout in [
+        (LifecycleManager(action), expected),
+        (LifecycleManager(action, drain_timeout=1), 1),
+    ]:
+        assert manager.drain_timeout == timeout
+        manager.shutdown()
+
+
+def test_begin_shutdown_abandons_retries(tmp_path, airflow_session):
+    session = airflow_session(post=lambda url, json: 500)
+    dlq = tmp_path / "dlq.jsonl"
+    action = AirflowTriggerAction(
+        "http://airflow", write_mappings(tmp_path), session=session, dlq_path=str(dlq)
+    )
+    action.begin_shutdown()
+    (result,) = action.trigger_targets({"type": "load_event", "seq": 1})
+    assert len(session.posts) == 1
+    assert "shutting down" in str(result.error)
+    assert dlq_seqs(dlq) == {1}
+
+
+def test_shutdown_flushes_outputs(tmp_path, airflow_session):
+    calls = []
+
+    class Emitter:
+        def close(self):
+            calls.append("emitter")
+
+    class Listener:
+        def stop(self):
+            calls.append("listener")
+
+    action = AirflowTriggerAction(
+        "http://airflow",
+        write_mappings(tmp_path),
+        session=airflow_session(health=requests.ConnectionError("down")),
+        dlq_path=str(tmp_path / "dlq.jsonl"),
+    )
+    manager = LifecycleManager(
+        action, status_emitter=Emitter(), log_listeners=[Listener()], drain_timeout=1
+    )
+    manager.submit({"type": "load_event", "seq": 1}).result(timeout=5)
+    report = manager.shutdown()
+    assert report.drained == 0 and not report.timed_out
+    assert calls == ["emitter", "listener"]
+    assert dlq_seqs(tmp_path / "dlq.jsonl") == {1}
+
+
+def test_replayed_leftover_already_triggered_is_not_requeued(tmp_path):
+    from scripts.replay_dlq import replay
+
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "load_event:\n  targets:\n    - dag_id: dag_a\n    - dag_id: dag_b\n"
+    )
+    dlq = tmp_path / "dlq.jsonl"
+    event = {"type": "load_event", "entityUrn": "urn:1"}
+    with AirflowStub(StubConfig(latency="fixed:300")) as stub:
+        action = AirflowTriggerAction(stub.url, str(path), dlq_path=str(dlq))
+        manager = LifecycleManager(action, drain_timeout=0.05)
+        future = manager.submit(event)
+        report = manager.shutdown()
+        future.result(timeout=5)
+        assert report.persisted == 1
+        entries = [json.loads(line) for line in dlq.read_text().splitlines()]
+        assert sorted(e["dag_id"] for e in entries) == ["dag_a", "dag_b"]
+        assert all(e["dag_run_id"] == action.dag_run_id(e["dag_id"], event) for e in entries)
+
+        stub.set_latency("fixed:0")
+        replayer = AirflowTriggerAction(stub.url, str(path))
+        assert replay(str(dlq), replayer) == 2
+        assert replay(str(dlq), replayer) == 0
+        assert dlq.read_text() == ""
+        assert stub.run_count == 2
+
+
+def test_only_unfinished_targets_persisted(tmp_path, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("load_event:\n  targets:\n    - dag_id: fast\n    - dag_id: slow\n")
+    release = threading.Event()
+
+    def post(url, json):
+        if "/slow/" in url:
+            release.wait(5)
+        return 200
+
+    dlq = tmp_path / "dlq.jsonl"
+    action = AirflowTriggerAction(
+        "http://airflow", str(path), session=airflow_session(post=post), dlq_path=str(dlq)
+    )
+    manager = LifecycleManager(action, drain_timeout=0.2)
+    manager.submit({"type": "load_event", "seq": 1})
+    report = manager.shutdown()
+    release.set()
+    entries = [json.loads(line) for line in dlq.read_text().splitlines()]
+    assert report.persisted == 1
+    assert [e["dag_id"] for e in entries] == ["slow"]
+
+
+def test_same_entity_triggered_in_submission_order(tmp_path, airflow_session):
+    posts = []
+
+    def post(url, json):
+        if json["conf"]["seq"] == 0:
+            time.sleep(0.1)
+        posts.append(json["conf"]["seq"])
+        return 200
+
+    action = AirflowTriggerAction(
+        "http://airflow", write_mappings(tmp_path), session=airflow_session(post=post)
+    )
+    manager = LifecycleManager(action, lanes=4, drain_timeout=5)
+    for seq in range(3):
+        manager.submit({"type": "load_event", "entityUrn": "urn:1", "seq": seq})
+    report = manager.shutdown()
+    assert report.drained == 3
+    assert posts == [0, 1, 2]
@@ -0,0 +1,150 @@
+import pathlib
+import random
+import sys
+
+import pytest
+import requests
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from scripts.airflow_stub import AirflowStub, StubConfig, latency_sampler, parse_args
+from scripts.load_test import load_events, run_load, synthetic_events
+
+
+@pytest.fixture
+def stub():
+    server = AirflowStub(StubConfig(token="t", seed=1)).start()
+    yield server
+    server.stop()
+
+
+def make_action(stub, tmp_path, **kwargs):
+    mappings = tmp_path / "mappings.yaml"
+    mappings.write_text("load_event:\n  dag_id: load_dag\n")
+    return AirflowTriggerAction(
+        stub.url,
+        str(mappings),
+        token="t",
+        backoff_factor=0,
+        dlq_path=str(tmp_path / "dlq.jsonl"),
+        **kwargs,
+    )
+
+
+def test_latency_sampler():
+    rng = random.Random(0)
+    assert latency_sampler("fixed:5", rng)() == 5
+    assert 1 <= latency_sampler("uniform:1,2", rng)() <= 2
+    assert latency_sampler("lognormal:10,0.5", rng)() > 0
+    with pytest.raises(ValueError):
+        latency_sampler("pareto:1", rng)
+
+
+def test_stub_auth(stub):
+    url = f"{stub.url}/api/v1/dags/d1/dagRuns"
+    assert requests.post(url, json={"dag_run_id": "r1"}).status_code == 401
+    bad = {"Authorization": "Bearer nope"}
+    assert requests.post(url, json={"dag_run_id": "r1"}, headers=bad).status_code == 403
+    stub.config.username, stub.config.password = "u", "p"
+    assert requests.post(url, json={"dag_run_id": "r1"}, auth=("u", "p")).status_code == 200
+
+
+def test_stub_duplicate_runs_conflict(stub):
+    url = f"{stub.url}/api/v1/dags/d1/dagRuns"
+    headers = {"Authorization": "Bearer t"}
+    body = {"dag_run_id": "r1", "conf": {"x": 1}}
+    assert requests.post(url, json=body, headers=headers).status_code == 200
+    assert requests.post(url, json=body, headers=headers).status_code == 409
+    runs = requests.get(url, headers=headers).json()
+    assert runs["total_entries"] == 1
+    assert runs["dag_runs"][0]["conf"] == {"x": 1}
+    assert stub.posts == 2 and stub.run_count == 1
+
+
+def test_stub_runs_progress(stub):
+    headers = {"Authorization": "Bearer t"}
+    stub.config.run_progression = "queued:10,running:10,success"
+    url = f"{stub.url}/api/v1/dags/d1/dagRuns"
+    assert requests.post(url, json={"dag_run_id": "r1"}, headers=headers).status_code == 200
+    run = requests.get(f"{url}/r1", headers=headers).json()
+    assert run["state"] == "queued" and "start_date" not in run
+    assert requests.get(f"{url}/missing", headers=headers).status_code == 404
+
+    created = stub.runs["d1"]["r1"]["created"]
+    assert stub.run_view(stub.runs["d1"]["r1"], created + 15)["state"] == "running"
+    done = stub.run_view(stub.runs["d1"]["r1"], created + 25)
+    assert done["state"] == "success" and done["end_date"] > done["start_date"]
+
+    stub.config.run_progression = "queued:0,failed"
+    listed = requests.post(
+        f"{stub.url}/api/v1/dags/~/dagRuns/list",
+        json={"dag_ids": ["d1"], "states": ["failed"], "start_date_gte": "2000-01-01T00:00:00Z"},
+        headers=headers,
+    ).json()
+    assert [(r["dag_run_id"], r["state"]) for r in listed["dag_runs"]] == [("r1", "failed")]
+
+
+def test_stub_outage(stub):
+    stub.outage = True
+    health = requests.get(f"{stub.url}/health").json()
+    assert health["scheduler"]["status"] == "unhealthy"
+    response = requests.post(
+        f"{stub.url}/api/v1/dags/d1/dagRuns",
+        json={"dag_run_id": "r1"},
+        headers={"Authorization": "Bearer t"},
+    )
+    assert response.status_code == 503
+    stub.outage = False
+    stub.config.outages = [(0, 60)]
+    assert stub.in_outage()
+
+
+def test_stub_throttles(stub):
+    stub.config.throttle_rate = 1.0
+    response = requests.post(
+        f"{stub.url}/api/v1/dags/d1/dagRuns",
+        json={"dag_run_id": "r1"},
+        headers={"Authorization": "Bearer t"},
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_stub_cli_exposes_fault_modes():
+    config, port = parse_args(
+        "--port 9000 --stall-rate 0.1 --stall-ms 50 --outage 5:2 --outage 20:1"
+        " --username u --password p --dag d1 --seed 7".split()
+    )
+    assert port == 9000
+    assert (config.stall_rate, config.stall_ms, config.seed) == (0.1, 50.0, 7)
+    assert config.outages == [(5.0, 2.0), (20.0, 1.0)]
+    assert (config.username, config.password) == ("u", "p")
+    assert [dag["dag_id"] for dag in config.dags] == ["d1"]
+
+
+def test_run_load_reports(stub, tmp_path):
+    action = make_action(stub, tmp_path)
+    report = run_load(action, synthetic_events(["load_event"], 20), rate=1000)
+    action.close()
+    assert report.events == report.targets == 20
+    assert report.failed == report.dlq_entries == 0
+    assert report.posts == report.runs == 20 and report.amplification == 1.0
+    assert stub.run_count == 20
+    assert len(report.latencies_ms) == 20 and report.percentile(0.99) > 0
+
+
+def test_run_load_counts_retries_and_dlq(stub, tmp_path):
+    stub.config.error_rate = 1.0
+    action = make_action(stub, tmp_path, max_retries=3)
+    report = run_load(action, synthetic_events(["load_event"], 5), rate=1000)
+    action.close()
+    assert report.failed == report.dlq_entries == 5
+    assert report.dlq_bytes > 0
+    assert report.posts == 15 and report.amplification == 3.0
+    assert report.summary()["amplification"] == 3.0
+
+
+def test_load_recorded_events(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text('{"type": "load_event", "n": 1}\n\n{"type": "other"}\n')
+    assert load_events(str(path)) == [{"type": "load_event", "n": 1}, {"type": "other"}]
@@ -0,0 +1,72 @@
+import io
+import json
+import logging
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger.logging_setup import (
+    JsonFormatter,
+    RateLimitFilter,
+    configure_logging,
+)
+from actions.airflow_trigger.metrics import log_records_suppressed_total
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(msg, level=logging.WARNING, **extra):
+    rec = logging.LogRecord("actions.airflow_trigger.action", level, __file__, 1, msg, (), None)
+    rec.__dict__.update(extra)
+    return rec
+
+
+def test_json_formatter_includes_context():
+    line = JsonFormatter().format(
+        record("triggered dag", logging.INFO, correlation_id="c1", dag_id="d1", dag_run_id="d1-x")
+    )
+    entry = json.loads(line)
+    assert entry["message"] == "triggered dag"
+    assert entry["level"] == "INFO"
+    assert (entry["correlation_id"], entry["dag_id"], entry["dag_run_id"]) == ("c1", "d1", "d1-x")
+
+
+def test_rate_limit_suppresses_and_reports():
+    clock = Clock()
+    limiter = RateLimitFilter(burst=2, interval=10, clock=clock)
+    before = log_records_suppressed_total.labels(dag_id="d1")._value.get()
+    passed = [limiter.filter(record("retry %s", dag_id="d1")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(record("retry %s", dag_id="d2"))
+    assert limiter.filter(record("info", logging.INFO, dag_id="d1"))
+    assert log_records_suppressed_total.labels(dag_id="d1")._value.get() == before + 3
+    clock.now = 11
+    rec = record("retry %s", dag_id="d1")
+    assert limiter.filter(rec)
+    assert rec.suppressed == 3
+
+
+def test_rate_limit_sampling():
+    limiter = RateLimitFilter(burst=1, interval=60, sample_every=3, clock=Clock())
+    passed = [limiter.filter(record("retry", dag_id="d1")) for _ in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+
+
+def test_configure_logging_writes_json_in_background():
+    stream = io.StringIO()
+    listener = configure_logging(stream=stream, logger_name="test_logging_setup")
+    logger = logging.getLogger("test_logging_setup")
+    try:
+        logger.info("triggered %s", "d1", extra={"correlation_id": "c1", "dag_id": "d1"})
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "triggered d1"
+    assert entry["correlation_id"] == "c1"
@@ -0,0 +1,161 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import mappings as mappings_mod
+from actions.airflow_trigger.mappings import compile_mappings, load_mappings
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+
+def test_cache_written_and_reused(tmp_path, monkeypatch):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n  conf:\n    foo: bar\n")
+    cache = tmp_path / "mappings.yaml.cache.json"
+
+    first = load_mappings(str(path))
+    assert first["sample_event"]["targets"][0]["dag_id"] == "d1"
+    assert json.loads(cache.read_text())["mappings"] == first
+
+    def fail(text):
+        raise AssertionError("YAML should not be parsed on a cache hit")
+
+    monkeypatch.setattr(mappings_mod, "_parse_yaml", fail)
+    assert load_mappings(str(path)) == first
+
+
+def test_cache_invalidated_on_change(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    load_mappings(str(path))
+    path.write_text("sample_event:\n  dag_id: d2\n")
+    assert load_mappings(str(path))["sample_event"]["targets"][0]["dag_id"] == "d2"
+
+
+def test_cache_only(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    cache = tmp_path / "compiled.json"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    compile_mappings(str(path), str(cache))
+    path.unlink()
+    loaded = load_mappings(str(path), str(cache))
+    assert loaded["sample_event"]["targets"][0]["dag_id"] == "d1"
+
+
+def test_missing_source_and_cache(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_mappings(str(tmp_path / "missing.yaml"))
+
+
+def test_invalid_mapping(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  conf: {}\n")
+    with pytest.raises(ValueError):
+        load_mappings(str(path))
+    assert not (tmp_path / "mappings.yaml.cache.json").exists()
+
+
+def test_unserializable_value_names_rule(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n  conf:\n    since: 2024-01-01\n")
+    with pytest.raises(ValueError, match="sample_event"):
+        load_mappings(str(path))
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_cache_write_failure_leaves_no_tmp(tmp_path):
+    cache = tmp_path / "compiled.json"
+    mappings_mod._write_cache(str(cache), "digest", {"e": {"since": object()}})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_path_from_env(tmp_path, monkeypatch):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    cache = tmp_path / "cache" / "mappings.cache.json"
+    cache.parent.mkdir()
+    monkeypatch.setenv("MAPPINGS_CACHE_PATH", str(cache))
+    load_mappings(str(path))
+    assert cache.exists()
+    assert not (tmp_path / "mappings.yaml.cache.json").exists()
+
+
+def test_targets_normalized(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "sample_event:\n"
+        "  targets:\n"
+        "    - dag_id: ingest\n"
+        "    - dag_id: quality\n"
+        "      conf:\n"
+        "        dataset: '{{urn}}'\n"
+        "      when: urn != null\n"
+    )
+    targets = load_mappings(str(path))["sample_event"]["targets"]
+    assert targets == [
+        {"dag_id": "ingest", "conf": {}},
+        {"dag_id": "quality", "conf": {"dataset": "{{urn}}"}, "when": "urn != null"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "e:\n  targets: []\n",
+        "e:\n  targets:\n    - dag_id: a\n    - dag_id: a\n",
+        "e:\n  dag_id: a\n  targets:\n    - dag_id: b\n",
+    ],
+)
+def test_invalid_targets(tmp_path, text):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        load_mappings(str(path))
+
+
+def test_batch_rule_normalized(tmp_path):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "e:\n  dag_id: quality\n  conf:\n    dataset: '{{urn}}'\n"
+        "  batch:\n    field: dataset\n    into: datasets\n    max_size: 50\n"
+    )
+    (target,) = load_mappings(str(path))["e"]["targets"]
+    assert target["batch"] == {
+        "field": "dataset",
+        "into": "datasets",
+        "max_size": 50,
+        "max_wait": 5.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "batch",
+    [
+        "[]",
+        "{into: datasets}",
+        "{field: missing, into: datasets}",
+        "{field: dataset, into: datasets, max_size: 0}",
+        "{field: dataset, into: datasets, max_wait: -1}",
+    ],
+)
+def test_invalid_batch(tmp_path, batch):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(f"e:\n  dag_id: a\n  conf:\n    dataset: x\n  batch: {batch}\n")
+    with pytest.raises(ValueError):
+        load_mappings(str(path))
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, actions.airflow_trigger;"
+        "heavy = {'requests', 'yaml', 'prometheus_client', 'uuid'};"
+        "print(sorted(heavy & set(sys.modules)))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
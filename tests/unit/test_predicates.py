@@ -0,0 +1,91 @@
+import pathlib
+import sys
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.predicates import PredicateCompiler, PredicateError
+
+
+def evaluate(expr, event):
+    return PredicateCompiler().compile(expr)(event, {})
+
+
+def test_comparisons_and_membership():
+    event = {"aspectName": "schemaMetadata", "platform": "snowflake", "version": 3}
+    expr = 'aspectName == "schemaMetadata" and platform in [snowflake, bigquery]'
+    assert evaluate(expr, event)
+    assert not evaluate(expr, {**event, "platform": "mysql"})
+    assert evaluate("version >= 3 and version < 4", event)
+    assert evaluate("platform not in ['mysql']", event)
+    assert evaluate("not (version == 1 or version == 2)", event)
+
+
+def test_nested_and_missing_fields():
+    event = {"entity": {"platform": "bigquery"}}
+    assert evaluate("entity.platform == 'bigquery'", event)
+    assert evaluate("missing.field == null", event)
+    assert not evaluate("missing > 1", event)
+    assert not evaluate("missing", event)
+
+
+@pytest.mark.parametrize(
+    "expr", ["", "a ==", "a == b)", "(a == 1", "a in [b", "a === 1", "and"]
+)
+def test_invalid_expressions(expr):
+    with pytest.raises(PredicateError):
+        PredicateCompiler().compile(expr)
+
+
+def test_bare_word_after_comparator_rejected():
+    with pytest.raises(PredicateError, match="quote string literals"):
+        PredicateCompiler().compile("aspectName == schemaMetadata")
+    assert evaluate("aspectName == 'schemaMetadata'", {"aspectName": "schemaMetadata"})
+    assert evaluate("tag in tags", {"tag": "pii", "tags": ["pii"]})
+
+
+def test_bare_words_in_list_are_strings():
+    assert evaluate("platform in [snowflake]", {"platform": "snowflake"})
+    assert not evaluate("platform in [snowflake]", {"snowflake": "snowflake"})
+
+
+def test_shared_terms_evaluated_once():
+    compiler = PredicateCompiler()
+    first = compiler.compile("kind == 'a' and n > 1")
+    second = compiler.compile("kind == 'a' and n > 2")
+    assert compiler.term_count == 3
+
+    class CountingEvent(dict):
+        gets = 0
+
+        def get(self, key, default=None):
+            CountingEvent.gets += 1
+            return super().get(key, default)
+
+    event = CountingEvent(kind="a", n=3)
+    memo = {}
+    assert first(event, memo) and second(event, memo)
+    assert CountingEvent.gets == 3
+
+
+def test_action_filters_event(tmp_path, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(
+        "sample_event:\n"
+        "  dag_id: d1\n"
+        "  when: platform in [snowflake, bigquery]\n"
+    )
+
+    session = airflow_session()
+    action = AirflowTriggerAction("http://airflow", str(path), session=session)
+    assert action.trigger({"type": "sample_event", "platform": "mysql"}) is None
+    assert session.calls == []
+
+
+@pytest.mark.parametrize("when", ["platform ==", "aspectName == schemaMetadata"])
+def test_invalid_predicate_rejected_at_load(tmp_path, when):
+    path = tmp_path / "mappings.yaml"
+    path.write_text(f"sample_event:\n  dag_id: d1\n  when: '{when}'\n")
+    with pytest.raises(ValueError, match="invalid predicate for sample_event"):
+        AirflowTriggerAction("http://airflow", str(path))
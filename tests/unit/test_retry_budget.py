@@ -0,0 +1,69 @@
+import pathlib
+import sys
+import time
+
+import pytest
+import requests
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.retry_budget import RetryBudget
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_budget_ratio_and_window():
+    clock = Clock()
+    budget = RetryBudget(0.5, window=10, min_retries=0, clock=clock)
+    assert not budget.try_retry()
+    for _ in range(4):
+        budget.record_attempt()
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+    clock.now += 11
+    for _ in range(2):
+        budget.record_attempt()
+    assert [budget.try_retry() for _ in range(2)] == [True, False]
+
+
+def test_min_retries_floor():
+    budget = RetryBudget(0.0, min_retries=2, clock=Clock())
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+
+
+def run_brownout(tmp_path, monkeypatch, session, retry_budget, events=100):
+    """Trigger ``events`` events against an Airflow returning 503 and count POSTs."""
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    dlq = tmp_path / f"dlq-{id(retry_budget)}.jsonl"
+    monkeypatch.setattr(time, "sleep", lambda s: None)
+    action = AirflowTriggerAction(
+        "http://airflow",
+        str(path),
+        session=session,
+        dlq_path=str(dlq),
+        max_retries=3,
+        retry_budget=retry_budget,
+    )
+    for i in range(events):
+        with pytest.raises(requests.HTTPError):
+            action.trigger({"type": "sample_event", "id": i})
+    assert len(dlq.read_text().splitlines()) == events
+    return len(session.posts) / events
+
+
+def test_retry_amplification_under_brownout(tmp_path, monkeypatch, airflow_session):
+    unbounded = run_brownout(
+        tmp_path, monkeypatch, airflow_session(post=lambda url, json: 503), None
+    )
+    budget = RetryBudget(0.1, window=60, min_retries=3)
+    bounded = run_brownout(
+        tmp_path, monkeypatch, airflow_session(post=lambda url, json: 503), budget
+    )
+    assert unbounded == 3.0
+    assert bounded <= 1.1 + 3 / 100
@@ -0,0 +1,263 @@
+import json
+import pathlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+from actions.airflow_trigger import AirflowTriggerAction
+from actions.airflow_trigger.run_poller import RunStatePoller
+from actions.airflow_trigger.status_emitter import RunStatus, RunStatusEmitter, to_mcp
+
+URN = "urn:li:dataset:(urn:li:dataPlatform:hive,db.t{},PROD)"
+
+
+class FakeGms:
+    """Stand-in GMS recording ``ingestProposalBatch`` calls."""
+
+    def __init__(self):
+        self.batches = []
+        self.failures = 0
+        self.requests = 0
+        self.headers = None
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests += 1
+                fake.headers = dict(self.headers)
+                assert self.path == "/aspects?action=ingestProposalBatch"
+                status = 200
+                if fake.failures:
+                    fake.failures -= 1
+                    status = 503
+                else:
+                    fake.batches.append(body["proposals"])
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def proposals(self):
+        return [p for batch in self.batches for p in batch]
+
+
+@pytest.fixture
+def gms():
+    fake = FakeGms()
+    yield fake
+    fake.server.shutdown()
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_to_mcp_patches_custom_properties():
+    mcp = to_mcp(RunStatus(URN.format(1), "d1", "d1-abc", "queued", 0.0))
+    assert mcp["entityType"] == "dataset"
+    assert mcp["changeType"] == "PATCH"
+    assert mcp["aspectName"] == "datasetProperties"
+    assert mcp["aspect"]["contentType"] == "application/json-patch+json"
+    patch = {op["path"]: op["value"] for op in json.loads(mcp["aspect"]["value"])}
+    assert patch["/customProperties/airflow.d1.last_dag_run_id"] == "d1-abc"
+    assert patch["/customProperties/airflow.d1.last_run_state"] == "queued"
+    assert patch["/customProperties/airflow.d1.last_run_time"].startswith("1970-01-01")
+
+
+def test_flushes_on_batch_size(gms):
+    emitter = RunStatusEmitter(gms.url, token="t", batch_size=3, flush_interval=60)
+    emitter.start()
+    for i in range(3):
+        assert emitter.record(URN.format(i), "d1", f"r{i}", "queued")
+    assert wait_for(lambda: len(gms.batches) == 1)
+    assert len(gms.batches[0]) == 3
+    assert gms.headers["Authorization"] == "Bearer t"
+    emitter.close()
+
+
+def test_flushes_on_interval(gms):
+    emitter = RunStatusEmitter(gms.url, batch_size=100, flush_interval=0.05)
+    emitter.start()
+    emitter.record(URN.format(1), "d1", "r1", "queued")
+    assert wait_for(lambda: len(gms.proposals()) == 1)
+    emitter.close()
+
+
+def test_coalesces_updates_per_entity_and_dag(gms):
+    emitter = RunStatusEmitter(gms.url)
+    emitter.record(URN.format(1), "d1", "r1", "queued")
+    emitter.record(URN.format(1), "d2", "r2", "queued")
+    emitter.record(URN.format(1), "d1", "r3", "trigger_failed")
+    emitter.record(URN.format(2), "d1", "r4", "queued")
+    assert emitter.pending == 3
+    emitter.close()
+    proposals = gms.proposals()
+    assert [p["entityUrn"] for p in proposals] == [URN.format(1)] * 2 + [URN.format(2)]
+    assert "r3" in proposals[0]["aspect"]["value"]
+    assert "airflow.d2.last_dag_run_id" in proposals[1]["aspect"]["value"]
+
+
+def test_retries_failed_batches(gms):
+    gms.failures = 2
+    emitter = RunStatusEmitter(gms.url, backoff_factor=0)
+    emitter.record(URN.format(1), "d1", "r1", "queued")
+    emitter.flush()
+    assert gms.requests == 3 and len(gms.proposals()) == 1
+
+
+def test_backpressure_when_full(gms):
+    emitter = RunStatusEmitter(gms.url, max_pending=2, block_timeout=0.05)
+    assert emitter.record(URN.format(1), "d1", "r1", "queued")
+    assert emitter.record(URN.format(2), "d1", "r2", "queued")
+    start = time.monotonic()
+    assert not emitter.record(URN.format(3), "d1", "r3", "queued")
+    assert time.monotonic() - start >= 0.05
+    # Updating an entity that is already buffered still fits.
+    assert emitter.record(URN.format(1), "d1", "r4", "queued")
+    emitter.flush()
+    assert emitter.record(URN.format(3), "d1", "r3", "queued")
+
+
+def test_blocked_record_resumes_after_flush(gms):
+    emitter = RunStatusEmitter(gms.url, max_pending=1, block_timeout=None)
+    emitter.record(URN.format(1), "d1", "r1", "queued")
+    recorded = []
+    writer = threading.Thread(
+        target=lambda: recorded.append(emitter.record(URN.format(2), "d1", "r2", "queued"))
+    )
+    writer.start()
+    time.sleep(0.05)
+    assert recorded == []
+    emitter.flush()
+    writer.join(1)
+    assert recorded == [True]
+    emitter.close()
+    assert len(gms.proposals()) == 2
+
+
+def test_skips_entities_without_properties_aspect(gms):
+    emitter = RunStatusEmitter(gms.url)
+    assert not emitter.record("urn:li:corpuser:alice", "d1", "r1", "queued")
+    assert emitter.pending == 0
+
+
+def test_action_records_run_status(tmp_path, gms, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  dag_id: d1\n")
+    emitter = RunStatusEmitter(gms.url)
+    action = AirflowTriggerAction(
+        "http://airflow", str(path), session=airflow_session(), status_emitter=emitter
+    )
+    dag_run_id = action.trigger({"type": "sample_event", "entityUrn": URN.format(1)})
+    action.trigger({"type": "sample_event"})
+    emitter.close()
+    (proposal,) = gms.proposals()
+    assert proposal["entityUrn"] == URN.format(1)
+    assert dag_run_id in proposal["aspect"]["value"]
+
+
+def test_poller_records_terminal_states(gms, airflow_session):
+    airflow = airflow_session(
+        runs={("d1", "r1"): "running", ("d2", "r2"): "failed", ("d2", "other"): "success"}
+    )
+    emitter = RunStatusEmitter(gms.url)
+    now = [1000.0]
+    poller = RunStatePoller(
+        "http://airflow", airflow, emitter, interval=60, max_age=600, clock=lambda: now[0]
+    )
+    poller.track(URN.format(1), "d1", "r1")
+    poller.track(URN.format(2), "d1", "r1")
+    poller.track(URN.format(1), "d2", "r2")
+    poller.track(URN.format(3), "d1", "deleted")
+    assert poller.tracked == 3
+    assert poller.poll() == 1
+    assert [c[1] for c in airflow.calls] == ["http://airflow/api/v1/dags/~/dagRuns/list"]
+    assert poller.tracked == 2
+    airflow.runs[("d1", "r1")] = "success"
+    now[0] += 600
+    assert poller.poll() == 1 and poller.tracked == 0
+    assert len(airflow.calls) == 2
+    emitter.close()
+    states = {
+        (p["entityUrn"], op["path"]): op["value"]
+        for p in gms.proposals()
+        for op in json.loads(p["aspect"]["value"])
+    }
+    assert states[(URN.format(1), "/customProperties/airflow.d2.last_run_state")] == "failed"
+    assert states[(URN.format(2), "/customProperties/airflow.d1.last_run_state")] == "success"
+    assert not any(urn == URN.format(3) for urn, _ in states)
+
+
+def test_poller_queries_in_bulk(airflow_session):
+    session = airflow_session()
+    now = [1000.0]
+    poller = RunStatePoller("http://airflow", session, None, clock=lambda: now[0])
+    for i in range(500):
+        poller.track(URN.format(i), f"d{i % 2}", f"r{i}")
+    now[0] += 30
+    assert poller.poll() == 0
+    now[0] += 30
+    assert poller.poll() == 0
+    first, second = [c[2] for c in session.calls]
+    assert first["dag_ids"] == ["d0", "d1"] and first["states"] == ["failed", "success"]
+    assert first["start_date_gte"] == second["start_date_gte"]
+    assert second["end_date_gte"] > first["end_date_gte"]
+
+
+def test_poller_keeps_runs_when_listing_fails(airflow_session):
+    poller = RunStatePoller("http://airflow", airflow_session(runs=OSError("down")), None)
+    poller.track(URN.format(1), "d1", "r1")
+    assert poller.poll() == 0 and poller.tracked == 1
+
+
+def test_poller_limits_tracked_runs(airflow_session):
+    poller = RunStatePoller("http://airflow", airflow_session(), None, max_tracked=1)
+    assert poller.track(URN.format(1), "d1", "r1")
+    assert poller.track(URN.format(2), "d1", "r1")
+    assert not poller.track(URN.format(1), "d1", "r2")
+
+
+def test_fanout_targets_keep_separate_status(tmp_path, gms, airflow_session):
+    path = tmp_path / "mappings.yaml"
+    path.write_text("sample_event:\n  targets:\n    - dag_id: d1\n    - dag_id: d2\n")
+    runs = {}
+
+    def post(url, json):
+        runs[(url.split("/")[-2], json["dag_run_id"])] = "success"
+        return 200
+
+    emitter = RunStatusEmitter(gms.url)
+    action = AirflowTriggerAction(
+        "http://airflow",
+        str(path),
+        session=airflow_session(post=post, runs=runs),
+        status_emitter=emitter,
+        run_state_poll_interval=60,
+    )
+    action.trigger({"type": "sample_event", "entityUrn": URN.format(1)})
+    assert action.run_poller.poll() == 2
+    action.close()
+    emitter.close()
+    values = {}
+    for proposal in gms.proposals():
+        for op in json.loads(proposal["aspect"]["value"]):
+            values[op["path"]] = op["value"]
+    assert values["/customProperties/airflow.d1.last_run_state"] == "success"
+    assert values["/customProperties/airflow.d2.last_run_state"] == "success"